@@ -0,0 +1,55 @@
+"""mentor skill index
+
+Revision ID: 002_mentor_skills
+Revises: 001_initial
+Create Date: 2025-06-21 00:00:00
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "002_mentor_skills"
+down_revision: Union[str, None] = "001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    mentor_skills = op.create_table(
+        "mentor_skills",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("skill", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "skill"),
+    )
+    op.create_index("ix_mentor_skills_skill_user_id", "mentor_skills", ["skill", "user_id"], unique=False)
+
+    # Backfill the index from the JSON blobs already stored on users.skills
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text("SELECT id, skills FROM users WHERE role = 'MENTOR' AND skills IS NOT NULL")
+    )
+    entries = []
+    for user_id, raw_skills in rows:
+        try:
+            skills = json.loads(raw_skills)
+        except ValueError:
+            continue
+        if not isinstance(skills, list):
+            continue
+        normalized = {str(skill).strip().lower() for skill in skills}
+        normalized.discard("")
+        entries.extend({"user_id": user_id, "skill": skill} for skill in sorted(normalized))
+
+    if entries:
+        op.bulk_insert(mentor_skills, entries)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_mentor_skills_skill_user_id", table_name="mentor_skills")
+    op.drop_table("mentor_skills")
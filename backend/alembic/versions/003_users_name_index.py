@@ -0,0 +1,26 @@
+"""index for keyset pagination of mentors by name
+
+Revision ID: 003_users_name_index
+Revises: 002_mentor_skills
+Create Date: 2025-06-22 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "003_users_name_index"
+down_revision: Union[str, None] = "002_mentor_skills"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_users_role_name_id", "users", ["role", "name", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_role_name_id", table_name="users")
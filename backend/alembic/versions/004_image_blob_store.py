@@ -0,0 +1,73 @@
+"""move profile images into the content-addressed blob store
+
+Revision ID: 004_image_blob_store
+Revises: 003_users_name_index
+Create Date: 2025-06-23 00:00:00
+
+"""
+import base64
+import binascii
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.images import blob_store, sniff_image_type
+
+
+# revision identifiers, used by Alembic.
+revision: str = "004_image_blob_store"
+down_revision: Union[str, None] = "003_users_name_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.add_column(sa.Column("image_hash", sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column("image_size", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("image_mime", sa.String(), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, profile_image FROM users WHERE profile_image IS NOT NULL"))
+    for user_id, payload in rows.fetchall():
+        try:
+            data = base64.b64decode(payload)
+        except (binascii.Error, ValueError):
+            # The old endpoint fell back to the default image for these; keep doing so
+            continue
+        if not data:
+            continue
+        conn.execute(
+            sa.text("UPDATE users SET image_hash = :hash, image_size = :size, image_mime = :mime WHERE id = :id"),
+            {
+                "hash": blob_store.put(data),
+                "size": len(data),
+                # The old endpoint always served image/jpeg
+                "mime": sniff_image_type(data) or "image/jpeg",
+                "id": user_id,
+            },
+        )
+
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("profile_image")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.add_column(sa.Column("profile_image", sa.Text(), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, image_hash FROM users WHERE image_hash IS NOT NULL"))
+    for user_id, digest in rows.fetchall():
+        if not blob_store.exists(digest):
+            continue
+        conn.execute(
+            sa.text("UPDATE users SET profile_image = :image WHERE id = :id"),
+            {"image": base64.b64encode(blob_store.read(digest)).decode(), "id": user_id},
+        )
+
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("image_mime")
+        batch_op.drop_column("image_size")
+        batch_op.drop_column("image_hash")
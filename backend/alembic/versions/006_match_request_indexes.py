@@ -0,0 +1,32 @@
+"""composite indexes for match request lookups
+
+Revision ID: 006_match_request_indexes
+Revises: 005_user_token_version
+Create Date: 2025-06-25 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "006_match_request_indexes"
+down_revision: Union[str, None] = "005_user_token_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_match_requests_mentee_id_status", "match_requests", ["mentee_id", "status"], unique=False
+    )
+    op.create_index(
+        "ix_match_requests_mentor_id_status", "match_requests", ["mentor_id", "status"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_match_requests_mentor_id_status", table_name="match_requests")
+    op.drop_index("ix_match_requests_mentee_id_status", table_name="match_requests")
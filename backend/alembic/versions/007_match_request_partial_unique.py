@@ -0,0 +1,62 @@
+"""partial unique indexes for match request states
+
+Revision ID: 007_match_request_partial_unique
+Revises: 006_match_request_indexes
+Create Date: 2025-06-26 00:00:00
+
+Rows left over from the old check-then-act races are resolved first so the
+indexes can be built: a mentee keeps only their newest pending request (older
+ones become CANCELLED) and a mentor keeps only their first accepted request
+(later ones become REJECTED).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "007_match_request_partial_unique"
+down_revision: Union[str, None] = "006_match_request_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # New enum labels must be committed before they can be used
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE matchrequeststatus ADD VALUE IF NOT EXISTS 'CANCELLED'")
+
+    op.execute(
+        """
+        UPDATE match_requests SET status = 'CANCELLED'
+        WHERE status = 'PENDING' AND id NOT IN (
+            SELECT MAX(id) FROM match_requests WHERE status = 'PENDING' GROUP BY mentee_id
+        )
+        """
+    )
+    op.execute(
+        """
+        UPDATE match_requests SET status = 'REJECTED'
+        WHERE status = 'ACCEPTED' AND id NOT IN (
+            SELECT MIN(id) FROM match_requests WHERE status = 'ACCEPTED' GROUP BY mentor_id
+        )
+        """
+    )
+
+    op.create_index(
+        "uq_match_requests_pending_mentee", "match_requests", ["mentee_id"], unique=True,
+        sqlite_where=sa.text("status = 'PENDING'"), postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_index(
+        "uq_match_requests_accepted_mentor", "match_requests", ["mentor_id"], unique=True,
+        sqlite_where=sa.text("status = 'ACCEPTED'"), postgresql_where=sa.text("status = 'ACCEPTED'"),
+    )
+
+
+def downgrade() -> None:
+    # The CANCELLED enum label is left in place; PostgreSQL cannot drop enum values
+    op.drop_index("uq_match_requests_accepted_mentor", table_name="match_requests")
+    op.drop_index("uq_match_requests_pending_mentee", table_name="match_requests")
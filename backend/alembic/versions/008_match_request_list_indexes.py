@@ -0,0 +1,39 @@
+"""keyset indexes for match request lists
+
+Revision ID: 008_match_request_list_indexes
+Revises: 007_match_request_partial_unique
+Create Date: 2025-06-27 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "008_match_request_list_indexes"
+down_revision: Union[str, None] = "007_match_request_partial_unique"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for owner in ("mentor_id", "mentee_id"):
+        op.create_index(
+            f"ix_match_requests_{owner}_created_at_id", "match_requests",
+            [owner, "created_at", "id"], unique=False,
+        )
+        # Supersedes the (owner, status) index from 006: same prefix, plus list order
+        op.create_index(
+            f"ix_match_requests_{owner}_status_created_at_id", "match_requests",
+            [owner, "status", "created_at", "id"], unique=False,
+        )
+        op.drop_index(f"ix_match_requests_{owner}_status", table_name="match_requests")
+
+
+def downgrade() -> None:
+    for owner in ("mentee_id", "mentor_id"):
+        op.create_index(f"ix_match_requests_{owner}_status", "match_requests", [owner, "status"], unique=False)
+        op.drop_index(f"ix_match_requests_{owner}_status_created_at_id", table_name="match_requests")
+        op.drop_index(f"ix_match_requests_{owner}_created_at_id", table_name="match_requests")
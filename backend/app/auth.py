@@ -1,22 +1,41 @@
 import os
-from jose import jwt, JWTError
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional
-from fastapi import HTTPException, Depends
+from typing import Optional, Union
+from fastapi import HTTPException, Depends, Request, WebSocket
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.crud import get_user_by_id
-from app.models import User
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_read_db
+from app.crud import get_user_by_id, get_user_token_version
+from app.models import User, UserRole
+from app.cache import user_rows, token_versions, token_cache
 
 # JWT configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-this-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 1
+# Authorize role-only endpoints from verified claims instead of loading the user row
+AUTH_STATELESS = os.getenv("AUTH_STATELESS", "false").lower() in ("1", "true", "yes")
 
 security = HTTPBearer()
 
 
+@dataclass(frozen=True)
+class TokenUser:
+    """The caller as described by verified token claims (stateless mode)."""
+    id: int
+    role: UserRole
+    name: str
+    email: str
+
+
+def _jwt():
+    # python-jose loads its cryptography backends on import; defer that to the first token
+    from jose import jwt
+    return jwt
+
+
 def create_access_token(user: User) -> str:
     issued_at = datetime.now(timezone.utc)
     expires_at = issued_at + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
@@ -34,13 +53,20 @@ def create_access_token(user: User) -> str:
         # Custom claims
         "name": user.name,
         "email": user.email,
-        "role": user.role.value
+        "role": user.role.value,
+        "ver": user.token_version or 0  # must match users.token_version
     }
     
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    return _jwt().encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
 def verify_token(token: str) -> Optional[dict]:
+    # The same token is presented many times a minute; skip the HMAC check on repeats
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    
+    jwt = _jwt()
     try:
         payload = jwt.decode(
             token, 
@@ -49,39 +75,118 @@ def verify_token(token: str) -> Optional[dict]:
             audience="mentor-mentee-app",
             issuer="mentor-mentee-app"
         )
+        remaining = payload["exp"] - time.time()
+        if remaining > 0:
+            token_cache.set(token, payload, ttl=remaining)
         return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
-    except JWTError:
+    except jwt.JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    token = credentials.credentials
-    payload = verify_token(token)
+def get_token_payload(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
+    payload = verify_token(credentials.credentials)
     
     if payload is None:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    user_id = int(payload.get("sub"))
-    user = get_user_by_id(db, user_id)
+    # Lets get_read_db keep recent writers on the primary
+    request.state.user_id = int(payload.get("sub"))
+    return payload
+
+
+async def authenticate_websocket(websocket: WebSocket, db: AsyncSession) -> Optional[dict]:
+    """Verified token payload of a WebSocket handshake, or None if it is unusable.
+
+    Browsers can't set headers on WebSocket connections, so the token may also
+    be passed as ``?token=``.
+    """
+    token = websocket.query_params.get("token")
+    if token is None:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" else None
+    if not token:
+        return None
+    try:
+        payload = verify_token(token)
+    except HTTPException:
+        return None
     
+    # Checked once per connection; the socket is closed when the token expires
+    token_version = await get_user_token_version(db, int(payload.get("sub")))
+    if token_version is None or payload.get("ver", 0) != token_version:
+        return None
+    return payload
+
+
+def _check_token_version(payload: dict, token_version: int) -> None:
+    if payload.get("ver", 0) != token_version:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
+
+def _snapshot(user: User) -> User:
+    # A transient copy is safe to share across requests and sessions
+    return User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+
+
+async def _load_user_snapshot(db: AsyncSession, user_id: int) -> Optional[User]:
+    user = await get_user_by_id(db, user_id)
+    if user is None:
+        return None
+    user = _snapshot(user)
+    token_versions.set_local(user_id, user.token_version)
+    return user
+
+
+async def get_current_user(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_read_db)
+) -> User:
+    user_id = int(payload.get("sub"))
+    if AUTH_STATELESS:
+        # Concurrent misses for the same user share one query
+        user = await user_rows.get_or_load(user_id, lambda: _load_user_snapshot(db, user_id))
+    else:
+        user = await get_user_by_id(db, user_id)
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
     
+    _check_token_version(payload, user.token_version)
     return user
 
 
-def get_current_mentor(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_principal(
+    payload: dict = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_read_db)
+) -> Union[User, TokenUser]:
+    if not AUTH_STATELESS:
+        return await get_current_user(payload, db)
+    
+    user_id = int(payload.get("sub"))
+    token_version = await token_versions.get_or_load(user_id, lambda: get_user_token_version(db, user_id))
+    if token_version is None:
+        raise HTTPException(status_code=401, detail="User not found")
+    
+    _check_token_version(payload, token_version)
+    return TokenUser(
+        id=user_id,
+        role=UserRole(payload.get("role")),
+        name=payload.get("name"),
+        email=payload.get("email")
+    )
+
+
+def get_current_mentor(current_user: User = Depends(get_current_principal)) -> User:
     if current_user.role.value != "mentor":
         raise HTTPException(status_code=403, detail="Access denied. Mentor role required.")
     return current_user
 
 
-def get_current_mentee(current_user: User = Depends(get_current_user)) -> User:
+def get_current_mentee(current_user: User = Depends(get_current_principal)) -> User:
     if current_user.role.value != "mentee":
         raise HTTPException(status_code=403, detail="Access denied. Mentee role required.")
     return current_user
@@ -0,0 +1,493 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from app import metrics
+
+logger = logging.getLogger(__name__)
+
+# How long a cached user row / token version may be served before re-reading the DB
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+# Verified JWT payloads; each entry lives until its token's exp
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+# Serialized /mentors pages; bounded by total body size rather than entry count
+MENTOR_LIST_CACHE_MAX_BYTES = int(os.getenv("MENTOR_LIST_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+# "memory" keeps everything in this process; "redis" shares entries and invalidations between workers
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "mentoring:")
+# Backoff between attempts to resubscribe to invalidations after losing the Redis connection
+CACHE_RECONNECT_MIN_SECONDS = float(os.getenv("CACHE_RECONNECT_MIN_SECONDS", "0.5"))
+CACHE_RECONNECT_MAX_SECONDS = float(os.getenv("CACHE_RECONNECT_MAX_SECONDS", "30"))
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a TTL."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized response bodies, bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[bytes, Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, count: bool = True) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        """Cached body and headers for ``key``; ``count=False`` leaves the hit/miss stats alone."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += count
+                return None
+            self._entries.move_to_end(key)
+            self.hits += count
+            return entry
+
+    def set(self, key: Hashable, body: bytes, headers: Dict[str, str]) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(previous[0])
+            self._entries[key] = (body, headers)
+            self.bytes += len(body)
+            while self.bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def writer(self, key: Hashable, headers: Dict[str, str]) -> "ResponseCacheWriter":
+        """Collect a streamed body for ``key``; it is stored when the writer is closed."""
+        return ResponseCacheWriter(self, key, headers)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class ResponseCacheWriter:
+    """Buffers a body as it is streamed, giving up once it could no longer be cached."""
+
+    def __init__(self, cache: ResponseCache, key: Hashable, headers: Dict[str, str]):
+        self.cache = cache
+        self.key = key
+        self.headers = headers
+        self._chunks: Optional[List[bytes]] = []
+        self._size = 0
+
+    def write(self, chunk: bytes) -> None:
+        if self._chunks is None:
+            return
+        self._size += len(chunk)
+        if self._size > self.cache.max_bytes:
+            self._chunks = None  # too big to cache; stop holding on to it
+        else:
+            self._chunks.append(chunk)
+
+    def close(self) -> None:
+        if self._chunks is not None:
+            self.cache.set(self.key, b"".join(self._chunks), self.headers)
+
+
+InvalidationHandler = Callable[[Any], None]
+
+
+class MemoryCacheBackend:
+    """Single-process backend: no shared tier, invalidations only reach this process."""
+
+    shared = False
+
+    def __init__(self):
+        self._handlers: Dict[str, List[InvalidationHandler]] = defaultdict(list)
+        self._reset_handlers: List[Callable[[], None]] = []
+
+    def on_invalidation(self, namespace: str, handler: InvalidationHandler) -> None:
+        self._handlers[namespace].append(handler)
+
+    def on_reset(self, handler: Callable[[], None]) -> None:
+        """Call ``handler`` when invalidations may have been missed and every local entry is suspect."""
+        self._reset_handlers.append(handler)
+
+    def _dispatch(self, namespace: str, key: Any) -> None:
+        for handler in self._handlers.get(namespace, ()):
+            handler(key)
+
+    def _reset(self) -> None:
+        for handler in self._reset_handlers:
+            handler()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        pass
+
+    async def delete(self, key: str) -> None:
+        pass
+
+    async def publish_invalidation(self, namespace: str, key: Any) -> None:
+        self._dispatch(namespace, key)
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisCacheBackend(MemoryCacheBackend):
+    """Shared tier in Redis (or anything speaking its protocol).
+
+    Invalidations are applied locally right away and published on a channel
+    that every worker listens to, so their local tiers drop the entry too.
+    If the subscription is lost the listener resubscribes with backoff and
+    then clears the local tiers, since anything published meanwhile was missed.
+    """
+
+    shared = True
+
+    def __init__(self, client, prefix: str = CACHE_KEY_PREFIX):
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+        self.channel = f"{prefix}invalidate"
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = CACHE_KEY_PREFIX) -> "RedisCacheBackend":
+        import redis.asyncio as redis  # only needed when CACHE_BACKEND=redis
+
+        return cls(redis.from_url(url), prefix)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+    async def publish_invalidation(self, namespace: str, key: Any) -> None:
+        # Our own message comes back through the listener as well; dropping twice is harmless
+        self._dispatch(namespace, key)
+        await self.client.publish(self.channel, json.dumps([namespace, key]))
+
+    async def start(self) -> None:
+        await self._subscribe()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def _subscribe(self) -> None:
+        pubsub = self.client.pubsub()
+        try:
+            await pubsub.subscribe(self.channel)
+        except BaseException:
+            await pubsub.close()
+            raise
+        self._pubsub = pubsub
+
+    async def _drop_subscription(self) -> None:
+        pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            try:
+                await pubsub.close()
+            except Exception:
+                pass  # the connection is already broken
+
+    async def _listen(self) -> None:
+        delay = CACHE_RECONNECT_MIN_SECONDS
+        while True:
+            try:
+                if self._pubsub is None:
+                    await self._subscribe()
+                    # Invalidations published while we were not subscribed never reached us
+                    self._reset()
+                    logger.info("Resubscribed to cache invalidations on %s", self.channel)
+                    delay = CACHE_RECONNECT_MIN_SECONDS
+                async for message in self._pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        namespace, key = json.loads(message["data"])
+                    except (TypeError, ValueError):
+                        logger.warning("Ignoring malformed cache invalidation %r", message["data"])
+                        continue
+                    self._dispatch(namespace, key)
+                return  # unsubscribed
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Usually a redis ConnectionError or TimeoutError; redis is only imported with this backend
+                logger.warning(
+                    "Lost the cache invalidation subscription, retrying in %.1fs", delay, exc_info=True
+                )
+                await self._drop_subscription()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, CACHE_RECONNECT_MAX_SECONDS)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(self.channel)
+            except Exception:
+                logger.warning("Could not unsubscribe from cache invalidations", exc_info=True)
+            await self._drop_subscription()
+        await self.client.close()
+
+
+def create_cache_backend(name: str = CACHE_BACKEND):
+    if name == "memory":
+        return MemoryCacheBackend()
+    if name == "redis":
+        return RedisCacheBackend.from_url(CACHE_REDIS_URL)
+    raise ValueError(f"Unknown cache backend: {name}")
+
+
+class SingleFlight:
+    """Coalesces concurrent loads of the same key into one call of the loader."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # shield: one caller giving up must not cancel the load for the others
+            return await asyncio.shield(future)
+        future = asyncio.ensure_future(loader())
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if future.done():
+                self._inflight.pop(key, None)
+            else:
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+
+class SharedCache:
+    """Per-process TTLCache in front of the configured backend's shared tier.
+
+    A miss in both tiers runs the loader once per key per process (single
+    flight); ``invalidate`` clears the shared tier and every worker's local one.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        local: TTLCache,
+        backend,
+        shared: bool = True,
+        encode: Callable[[Any], bytes] = lambda value: json.dumps(value).encode(),
+        decode: Callable[[bytes], Any] = json.loads,
+    ):
+        self.namespace = namespace
+        self.local = local
+        self.backend = backend
+        self.shared = shared
+        self.encode = encode
+        self.decode = decode
+        self.flight = SingleFlight()
+        self.shared_hits = 0
+        self.shared_errors = 0
+        # Bumped by every invalidation; a load that overlapped one is not stored
+        self._epoch = 0
+        backend.on_invalidation(namespace, self._drop_local)
+        backend.on_reset(self._clear_local)
+
+    def _drop_local(self, key: Any) -> None:
+        self._epoch += 1
+        self.local.delete(key)
+
+    def _clear_local(self) -> None:
+        self._epoch += 1
+        self.local.clear()
+
+    def _shared_key(self, key: Any) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _uses_shared_tier(self) -> bool:
+        return self.shared and self.backend.shared
+
+    async def get_or_load(self, key: Any, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        return await self.flight.do(key, lambda: self._load(key, loader))
+
+    async def _load(self, key: Any, loader: Callable[[], Awaitable[Any]]) -> Any:
+        epoch = self._epoch
+        if self._uses_shared_tier():
+            try:
+                raw = await self.backend.get(self._shared_key(key))
+            except Exception:
+                # The shared tier is an optimization; fall through to the loader
+                self.shared_errors += 1
+                logger.warning("Shared cache read failed for %s", self._shared_key(key), exc_info=True)
+                raw = None
+            if raw is not None:
+                self.shared_hits += 1
+                value = self.decode(raw)
+                if epoch == self._epoch:
+                    self.local.set(key, value)
+                return value
+
+        value = await loader()
+        if value is not None and epoch == self._epoch:
+            self.local.set(key, value)
+            if self._uses_shared_tier():
+                try:
+                    await self.backend.set(self._shared_key(key), self.encode(value), self.local.ttl)
+                except Exception:
+                    self.shared_errors += 1
+                    logger.warning("Shared cache write failed for %s", self._shared_key(key), exc_info=True)
+        return value
+
+    def set_local(self, key: Any, value: Any) -> None:
+        self.local.set(key, value)
+
+    async def invalidate(self, key: Any) -> None:
+        self._drop_local(key)
+        try:
+            if self._uses_shared_tier():
+                await self.backend.delete(self._shared_key(key))
+            await self.backend.publish_invalidation(self.namespace, key)
+        except Exception:
+            # The write has already committed; other workers catch up when their TTL lapses
+            self.shared_errors += 1
+            logger.error("Cache invalidation failed for %s", self._shared_key(key), exc_info=True)
+
+    def stats(self) -> dict:
+        return {
+            **self.local.stats(),
+            "shared_hits": self.shared_hits,
+            "shared_errors": self.shared_errors,
+            "coalesced_loads": self.flight.coalesced,
+        }
+
+
+# User rows for endpoints that need the full User in stateless auth mode
+user_cache = TTLCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS)
+# users.token_version per user id, checked against the token's "ver" claim
+token_version_cache = TTLCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL_SECONDS)
+# token string -> decoded payload; the per-entry TTL is set from the token's exp
+token_cache = TTLCache(TOKEN_CACHE_MAX_ENTRIES, ttl=0)
+# (mentors collection version, query...) -> serialized /mentors page
+mentor_list_cache = ResponseCache(MENTOR_LIST_CACHE_MAX_BYTES)
+
+cache_backend = create_cache_backend()
+# User rows hold ORM snapshots, so only their invalidations are shared; token versions
+# are plain ints and live in the shared tier as well
+user_rows = SharedCache("user", user_cache, cache_backend, shared=False)
+token_versions = SharedCache(
+    "token_version", token_version_cache, cache_backend,
+    encode=lambda version: str(version).encode(), decode=int,
+)
+cache_backend.on_invalidation("mentor_list", lambda _: mentor_list_cache.clear())
+cache_backend.on_reset(mentor_list_cache.clear)
+
+metrics.register("user_cache", user_rows.stats)
+metrics.register("token_version_cache", token_versions.stats)
+metrics.register("token_cache", token_cache.stats)
+metrics.register("mentor_list_cache", mentor_list_cache.stats)
+
+
+async def invalidate_user(user_id: int) -> None:
+    await user_rows.invalidate(user_id)
+    await token_versions.invalidate(user_id)
+
+
+async def invalidate_mentor_list() -> None:
+    # Keys carry the collection version, so other workers' stale pages can never be hit either;
+    # clearing just frees memory as soon as the directory changes
+    try:
+        await cache_backend.publish_invalidation("mentor_list", None)
+    except Exception:
+        logger.warning("Mentor list invalidation could not be published", exc_info=True)
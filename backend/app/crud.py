@@ -1,35 +1,111 @@
-import json
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from passlib.context import CryptContext
-from app.models import User, MatchRequest, UserRole, MatchRequestStatus
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, List, Sequence, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Text, and_, or_, case, select, insert, update, delete, exists, func, literal, tuple_, type_coerce, Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models import User, MentorSkill, MatchRequest, CollectionVersion, UserRole, MatchRequestStatus
+from app.passwords import password_hasher
+from app import events
+from app.cache import invalidate_user, invalidate_mentor_list
+from app.database import note_write
+from app.images import blob_store, decode_image_payload, schedule_thumbnails
+from app.projections import user_projection, match_request_projection
 from app.schemas import (
     SignupRequest, UpdateMentorProfileRequest, UpdateMenteeProfileRequest,
     MatchRequestCreate
 )
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+def normalize_skill(skill: str) -> str:
+    return skill.strip().lower()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
 
+async def _sync_skill_index(db: AsyncSession, user_id: int, skills: List[str]) -> None:
+    # Replace the user's rows in the inverted index; caller commits.
+    await db.execute(delete(MentorSkill).where(MentorSkill.user_id == user_id))
+    normalized = {normalize_skill(skill) for skill in skills}
+    normalized.discard("")
+    db.add_all(MentorSkill(user_id=user_id, skill=skill) for skill in sorted(normalized))
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
 
+def _decode_and_store_image(payload: str):
+    # Raises InvalidImage before anything is written if the payload is unusable
+    data, mime_type = decode_image_payload(payload)
+    return blob_store.put(data), len(data), mime_type
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
-    return db.query(User).filter(User.email == email).first()
 
+async def _store_profile_image(user: User, payload: str) -> None:
+    # Decoding, hashing and the file write stay off the event loop
+    user.image_hash, user.image_size, user.image_mime = await asyncio.to_thread(_decode_and_store_image, payload)
+    schedule_thumbnails(user.image_hash, user.image_mime)
 
-def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
-    return db.query(User).filter(User.id == user_id).first()
 
+# Version counters behind the list endpoints' ETags
+MENTORS_COLLECTION = "mentors"
 
-def create_user(db: Session, user: SignupRequest) -> User:
-    hashed_password = get_password_hash(user.password)
+
+def match_requests_collection(user_id: int) -> str:
+    # Backs both the mentor's incoming and the mentee's outgoing list
+    return f"match_requests:{user_id}"
+
+
+async def get_collection_version(db: AsyncSession, name: str) -> int:
+    result = await db.execute(select(CollectionVersion.version).where(CollectionVersion.name == name))
+    return result.scalar_one_or_none() or 0
+
+
+async def bump_collection_versions(db: AsyncSession, names) -> None:
+    # Runs inside the caller's write transaction so the version and the data commit together.
+    # Sorted so concurrent writers lock rows in the same order.
+    dialect_insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = dialect_insert(CollectionVersion).values(
+        [{"name": name, "version": 1} for name in sorted(set(names))]
+    )
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[CollectionVersion.name], set_={"version": CollectionVersion.version + 1}
+    ))
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
+    result = await db.execute(select(User).where(User.id == user_id))
+    return result.scalars().first()
+
+
+async def get_user_token_version(db: AsyncSession, user_id: int) -> Optional[int]:
+    result = await db.execute(select(User.token_version).where(User.id == user_id))
+    return result.scalar_one_or_none()
+
+
+async def revoke_user_tokens(db: AsyncSession, user_id: int) -> None:
+    """Invalidate every token issued to the user so far."""
+    await db.execute(
+        update(User).where(User.id == user_id).values(token_version=User.token_version + 1)
+    )
+    await db.commit()
+    await invalidate_user(user_id)
+    note_write(user_id)
+
+
+async def get_user_image_info(db: AsyncSession, user_id: int, role: str) -> Optional[Row]:
+    result = await db.execute(
+        select(User.image_hash, User.image_mime, User.updated_at, User.created_at)
+        .where(User.id == user_id, User.role == role)
+    )
+    return result.first()
+
+
+async def create_user(db: AsyncSession, user: SignupRequest, hashed_password: Optional[str] = None) -> User:
+    if hashed_password is None:
+        hashed_password = await password_hasher.hash(user.password)
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -37,22 +113,26 @@ def create_user(db: Session, user: SignupRequest) -> User:
         role=user.role
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    if user.role == UserRole.MENTOR:
+        await bump_collection_versions(db, [MENTORS_COLLECTION])
+    await db.commit()
+    await db.refresh(db_user)
+    if user.role == UserRole.MENTOR:
+        await invalidate_mentor_list()
     return db_user
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    user = get_user_by_email(db, email)
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await password_hasher.verify(password, user.hashed_password):
         return None
     return user
 
 
-def update_mentor_profile(db: Session, user_id: int, profile: UpdateMentorProfileRequest) -> Optional[User]:
-    user = db.query(User).filter(User.id == user_id).first()
+async def update_mentor_profile(db: AsyncSession, user_id: int, profile: UpdateMentorProfileRequest) -> Optional[User]:
+    user = await get_user_by_id(db, user_id)
     if not user or user.role != UserRole.MENTOR:
         return None
     
@@ -60,17 +140,22 @@ def update_mentor_profile(db: Session, user_id: int, profile: UpdateMentorProfil
     if profile.bio is not None:
         user.bio = profile.bio
     if profile.image is not None:
-        user.profile_image = profile.image
+        await _store_profile_image(user, profile.image)
     if profile.skills is not None:
-        user.skills = json.dumps(profile.skills)
+        user.skills = profile.skills
+        await _sync_skill_index(db, user.id, profile.skills)
     
-    db.commit()
-    db.refresh(user)
+    await bump_collection_versions(db, [MENTORS_COLLECTION])
+    await db.commit()
+    await db.refresh(user)
+    await invalidate_user(user.id)
+    await invalidate_mentor_list()
+    note_write(user.id)
     return user
 
 
-def update_mentee_profile(db: Session, user_id: int, profile: UpdateMenteeProfileRequest) -> Optional[User]:
-    user = db.query(User).filter(User.id == user_id).first()
+async def update_mentee_profile(db: AsyncSession, user_id: int, profile: UpdateMenteeProfileRequest) -> Optional[User]:
+    user = await get_user_by_id(db, user_id)
     if not user or user.role != UserRole.MENTEE:
         return None
     
@@ -78,114 +163,343 @@ def update_mentee_profile(db: Session, user_id: int, profile: UpdateMenteeProfil
     if profile.bio is not None:
         user.bio = profile.bio
     if profile.image is not None:
-        user.profile_image = profile.image
+        await _store_profile_image(user, profile.image)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    await invalidate_user(user.id)
+    note_write(user.id)
     return user
 
 
-def get_mentors(db: Session, skill: Optional[str] = None, order_by: Optional[str] = None) -> List[User]:
-    query = db.query(User).filter(User.role == UserRole.MENTOR)
-    
-    if skill:
-        query = query.filter(User.skills.contains(skill))
-    
+def _mentor_sort_column(order_by: Optional[str]):
     if order_by == "name":
-        query = query.order_by(User.name)
-    elif order_by == "skill":
-        query = query.order_by(User.skills)
+        return User.name
+    if order_by == "skill":
+        # Order by the stored JSON text, not the decoded list; coalesce so keyset comparisons never see NULL
+        return func.coalesce(type_coerce(User.skills, Text), "")
+    return None
+
+
+async def _stream_partitions(db: AsyncSession, query, batch_size: int) -> AsyncIterator[Sequence[Row]]:
+    # Server-side cursor: only one batch of rows is held in memory at a time
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    try:
+        async for rows in result.partitions():
+            yield rows
+    finally:
+        await result.close()
+
+
+def _mentors_query(skill, order_by, skill_prefix, columns, after, limit):
+    sort_column = _mentor_sort_column(order_by)
+    selected = list(columns or user_projection(UserRole.MENTOR).columns)
+    if sort_column is not None:
+        selected.append(sort_column.label("sort_key"))
+
+    # Id the default order pages by; for an exact skill the index already yields them in order
+    id_column = User.id
+    if skill and normalize_skill(skill):
+        # Driven from the mentor_skills index and joined to users by primary key, so only
+        # matching mentors are read. mentor_skills only holds mentors' rows, and leaving
+        # out the role filter keeps SQLite from walking ix_users_role_name_id instead.
+        term = normalize_skill(skill)
+        query = select(*selected).select_from(MentorSkill).join(User, User.id == MentorSkill.user_id)
+        if skill_prefix:
+            # Half-open range [term, next) lets SQLite use the index, unlike LIKE 'term%'
+            upper = term[:-1] + chr(ord(term[-1]) + 1)
+            # A mentor can have several skills with the prefix
+            query = query.where(MentorSkill.skill >= term, MentorSkill.skill < upper).distinct()
+        else:
+            query = query.where(MentorSkill.skill == term)
+            id_column = MentorSkill.user_id
+    else:
+        query = select(*selected).where(User.role == UserRole.MENTOR)
+    
+    if sort_column is not None:
+        if after is not None:
+            query = query.where(tuple_(sort_column, User.id) > tuple_(*after))
+        query = query.order_by(sort_column, User.id)
     else:
-        query = query.order_by(User.id)
+        if after is not None:
+            query = query.where(id_column > after[0])
+        query = query.order_by(id_column)
     
-    return query.all()
+    if limit is not None:
+        query = query.limit(limit)
+    return query
 
 
-def create_match_request(db: Session, mentee_id: int, request: MatchRequestCreate) -> Optional[MatchRequest]:
-    # Check if mentor exists
-    mentor = db.query(User).filter(User.id == request.mentorId, User.role == UserRole.MENTOR).first()
-    if not mentor:
-        return None
-    
-    # Check if mentee already has a pending request
-    existing_request = db.query(MatchRequest).filter(
-        MatchRequest.mentee_id == mentee_id,
-        MatchRequest.status == MatchRequestStatus.PENDING
-    ).first()
-    if existing_request:
+async def get_mentors(
+    db: AsyncSession,
+    skill: Optional[str] = None,
+    order_by: Optional[str] = None,
+    skill_prefix: bool = False,
+    columns: Optional[Sequence] = None,
+    after: Optional[List] = None,
+    limit: Optional[int] = None
+) -> List[Row]:
+    """Return mentor rows as column tuples, ordered by (order_by, id).
+
+    ``columns`` are a projection's columns (all mentor fields by default),
+    followed by ``sort_key`` when ordering by name or skill;
+    ``after`` is the sort key of the last row of the previous page.
+    """
+    result = await db.execute(_mentors_query(skill, order_by, skill_prefix, columns, after, limit))
+    return result.all()
+
+
+def stream_mentors(
+    db: AsyncSession,
+    skill: Optional[str] = None,
+    order_by: Optional[str] = None,
+    skill_prefix: bool = False,
+    columns: Optional[Sequence] = None,
+    after: Optional[List] = None,
+    batch_size: int = 500
+) -> AsyncIterator[Sequence[Row]]:
+    """Every mentor row :func:`get_mentors` would return, in batches of ``batch_size``."""
+    return _stream_partitions(db, _mentors_query(skill, order_by, skill_prefix, columns, after, None), batch_size)
+
+
+def _match_request_collections(match_requests) -> List[str]:
+    names = []
+    for match_request in match_requests:
+        names += [match_requests_collection(match_request.mentor_id), match_requests_collection(match_request.mentee_id)]
+    return names
+
+
+async def _execute_transition(db: AsyncSession, statement) -> Optional[MatchRequest]:
+    # One statement: the WHERE clause is the precondition, RETURNING the result.
+    # None when no row qualified or a partial unique index lost us a race.
+    try:
+        result = await db.execute(statement)
+        match_request = result.scalars().first()
+        if match_request is not None:
+            await bump_collection_versions(db, _match_request_collections([match_request]))
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
         return None
-    
-    match_request = MatchRequest(
-        mentor_id=request.mentorId,
-        mentee_id=mentee_id,
-        message=request.message,
-        status=MatchRequestStatus.PENDING
+    return match_request
+
+
+def _transition(status: MatchRequestStatus, *conditions):
+    return update(MatchRequest).where(*conditions).values(status=status).returning(MatchRequest)
+
+
+def _no_accepted_request(mentor_id: int):
+    # Mentor may only have one accepted request
+    accepted = aliased(MatchRequest)
+    return ~exists().where(accepted.mentor_id == mentor_id, accepted.status == MatchRequestStatus.ACCEPTED)
+
+
+async def create_match_request(db: AsyncSession, mentee_id: int, request: MatchRequestCreate) -> Optional[MatchRequest]:
+    # INSERT ... SELECT inserts nothing unless the mentor exists; the partial unique
+    # index rejects a second pending request from the same mentee.
+    mentor = select(
+        User.id,
+        literal(mentee_id),
+        literal(request.message, MatchRequest.message.type),
+        literal(MatchRequestStatus.PENDING, MatchRequest.status.type),
+    ).where(User.id == request.mentorId, User.role == UserRole.MENTOR)
+    statement = (
+        insert(MatchRequest)
+        .from_select(["mentor_id", "mentee_id", "message", "status"], mentor)
+        .returning(MatchRequest)
     )
-    db.add(match_request)
-    db.commit()
-    db.refresh(match_request)
+    match_request = await _execute_transition(db, statement)
+    if match_request is not None:
+        note_write(mentee_id)
+        await events.publish_match_request("created", match_request)
     return match_request
 
 
-def get_incoming_match_requests(db: Session, mentor_id: int) -> List[MatchRequest]:
-    return db.query(MatchRequest).filter(MatchRequest.mentor_id == mentor_id).all()
+# Projection columns, then created_at for the page cursor
+MATCH_REQUEST_LIST_COLUMNS = match_request_projection().columns + (MatchRequest.created_at,)
 
 
-def get_outgoing_match_requests(db: Session, mentee_id: int) -> List[MatchRequest]:
-    return db.query(MatchRequest).filter(MatchRequest.mentee_id == mentee_id).all()
+def _match_requests_query(owner_column, owner_id, status, since, after, limit):
+    query = select(*MATCH_REQUEST_LIST_COLUMNS).where(owner_column == owner_id)
+    if status is not None:
+        query = query.where(MatchRequest.status == status)
+    if since is not None:
+        query = query.where(MatchRequest.created_at >= since)
+    if after is not None:
+        # Typed literal so SQLite compares the timestamp in its stored text format
+        created_at, request_id = after
+        query = query.where(
+            tuple_(MatchRequest.created_at, MatchRequest.id)
+            > tuple_(literal(created_at, MatchRequest.created_at.type), request_id)
+        )
+    query = query.order_by(MatchRequest.created_at, MatchRequest.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
 
 
-def accept_match_request(db: Session, request_id: int, mentor_id: int) -> Optional[MatchRequest]:
-    # Check if mentor already has an accepted request
-    existing_accepted = db.query(MatchRequest).filter(
-        MatchRequest.mentor_id == mentor_id,
-        MatchRequest.status == MatchRequestStatus.ACCEPTED
-    ).first()
-    if existing_accepted:
-        return None
-    
-    match_request = db.query(MatchRequest).filter(
+async def _list_match_requests(db: AsyncSession, owner_column, owner_id: int, *filters) -> List[Row]:
+    result = await db.execute(_match_requests_query(owner_column, owner_id, *filters))
+    return result.all()
+
+
+async def get_incoming_match_requests(
+    db: AsyncSession,
+    mentor_id: int,
+    status: Optional[MatchRequestStatus] = None,
+    since: Optional[datetime] = None,
+    after: Optional[List] = None,
+    limit: Optional[int] = None
+) -> List[Row]:
+    """Return the mentor's requests ordered by (created_at, id).
+
+    ``since`` keeps requests created at or after that time; ``after`` is the
+    (created_at, id) of the last row of the previous page.
+    """
+    return await _list_match_requests(db, MatchRequest.mentor_id, mentor_id, status, since, after, limit)
+
+
+async def get_outgoing_match_requests(
+    db: AsyncSession,
+    mentee_id: int,
+    status: Optional[MatchRequestStatus] = None,
+    since: Optional[datetime] = None,
+    after: Optional[List] = None,
+    limit: Optional[int] = None
+) -> List[Row]:
+    """Outgoing counterpart of :func:`get_incoming_match_requests`."""
+    return await _list_match_requests(db, MatchRequest.mentee_id, mentee_id, status, since, after, limit)
+
+
+def stream_incoming_match_requests(
+    db: AsyncSession,
+    mentor_id: int,
+    status: Optional[MatchRequestStatus] = None,
+    since: Optional[datetime] = None,
+    after: Optional[List] = None,
+    batch_size: int = 500
+) -> AsyncIterator[Sequence[Row]]:
+    """Every row :func:`get_incoming_match_requests` would return, in batches of ``batch_size``."""
+    query = _match_requests_query(MatchRequest.mentor_id, mentor_id, status, since, after, None)
+    return _stream_partitions(db, query, batch_size)
+
+
+def stream_outgoing_match_requests(
+    db: AsyncSession,
+    mentee_id: int,
+    status: Optional[MatchRequestStatus] = None,
+    since: Optional[datetime] = None,
+    after: Optional[List] = None,
+    batch_size: int = 500
+) -> AsyncIterator[Sequence[Row]]:
+    """Outgoing counterpart of :func:`stream_incoming_match_requests`."""
+    query = _match_requests_query(MatchRequest.mentee_id, mentee_id, status, since, after, None)
+    return _stream_partitions(db, query, batch_size)
+
+
+async def accept_match_request(db: AsyncSession, request_id: int, mentor_id: int) -> Optional[MatchRequest]:
+    statement = _transition(
+        MatchRequestStatus.ACCEPTED,
         MatchRequest.id == request_id,
         MatchRequest.mentor_id == mentor_id,
-        MatchRequest.status == MatchRequestStatus.PENDING
-    ).first()
-    
-    if not match_request:
-        return None
-    
-    match_request.status = MatchRequestStatus.ACCEPTED
-    db.commit()
-    db.refresh(match_request)
+        MatchRequest.status == MatchRequestStatus.PENDING,
+        _no_accepted_request(mentor_id),
+    )
+    match_request = await _execute_transition(db, statement)
+    if match_request is not None:
+        note_write(mentor_id)
+        await events.publish_match_request("accepted", match_request)
     return match_request
 
 
-def reject_match_request(db: Session, request_id: int, mentor_id: int) -> Optional[MatchRequest]:
-    match_request = db.query(MatchRequest).filter(
+async def reject_match_request(db: AsyncSession, request_id: int, mentor_id: int) -> Optional[MatchRequest]:
+    statement = _transition(
+        MatchRequestStatus.REJECTED,
         MatchRequest.id == request_id,
         MatchRequest.mentor_id == mentor_id,
-        MatchRequest.status == MatchRequestStatus.PENDING
-    ).first()
-    
-    if not match_request:
-        return None
-    
-    match_request.status = MatchRequestStatus.REJECTED
-    db.commit()
-    db.refresh(match_request)
+        MatchRequest.status == MatchRequestStatus.PENDING,
+    )
+    match_request = await _execute_transition(db, statement)
+    if match_request is not None:
+        note_write(mentor_id)
+        await events.publish_match_request("rejected", match_request)
     return match_request
 
 
-def cancel_match_request(db: Session, request_id: int, mentee_id: int) -> Optional[MatchRequest]:
-    match_request = db.query(MatchRequest).filter(
-        MatchRequest.id == request_id,
-        MatchRequest.mentee_id == mentee_id
-    ).first()
-    
-    if not match_request:
-        return None
-    
+async def process_match_requests(
+    db: AsyncSession, mentor_id: int, request_ids: List[int], status: MatchRequestStatus
+) -> Tuple[List[MatchRequest], Dict[int, MatchRequestStatus]]:
+    """Accept or reject many of a mentor's requests in one transaction.
+
+    Returns the updated requests plus the current status of every other id that
+    belongs to the mentor; ids in neither don't exist or aren't the mentor's.
+    A mentor can hold a single accepted request, so accepting takes the first
+    pending id in ``request_ids`` order.
+    """
+    if status == MatchRequestStatus.ACCEPTED:
+        candidate = aliased(MatchRequest)
+        first_pending = (
+            select(candidate.id)
+            .where(
+                candidate.id.in_(request_ids),
+                candidate.mentor_id == mentor_id,
+                candidate.status == MatchRequestStatus.PENDING,
+            )
+            .order_by(case({request_id: position for position, request_id in enumerate(request_ids)}, value=candidate.id))
+            .limit(1)
+            .scalar_subquery()
+        )
+        statement = _transition(
+            status,
+            MatchRequest.id == first_pending,
+            MatchRequest.mentor_id == mentor_id,
+            MatchRequest.status == MatchRequestStatus.PENDING,
+            _no_accepted_request(mentor_id),
+        )
+    else:
+        statement = _transition(
+            status,
+            MatchRequest.id.in_(request_ids),
+            MatchRequest.mentor_id == mentor_id,
+            MatchRequest.status == MatchRequestStatus.PENDING,
+        )
+
+    try:
+        updated = (await db.execute(statement)).scalars().all()
+        if updated:
+            await bump_collection_versions(db, _match_request_collections(updated))
+    except IntegrityError:
+        # Lost an accept race; report the remaining ids with their current status
+        await db.rollback()
+        updated = []
+
+    updated_ids = {match_request.id for match_request in updated}
+    remaining = [request_id for request_id in request_ids if request_id not in updated_ids]
+    current = {}
+    if remaining:
+        result = await db.execute(
+            select(MatchRequest.id, MatchRequest.status).where(
+                MatchRequest.id.in_(remaining), MatchRequest.mentor_id == mentor_id
+            )
+        )
+        current = dict(result.all())
+    await db.commit()
+    if updated:
+        note_write(mentor_id)
+    for match_request in updated:
+        await events.publish_match_request(status.value, match_request)
+    return updated, current
+
+
+async def cancel_match_request(db: AsyncSession, request_id: int, mentee_id: int) -> Optional[MatchRequest]:
     # API 문서에 따라 상태를 cancelled로 변경하고 삭제하지 않음
-    match_request.status = MatchRequestStatus.CANCELLED
-    db.commit()
-    db.refresh(match_request)
+    statement = _transition(
+        MatchRequestStatus.CANCELLED,
+        MatchRequest.id == request_id,
+        MatchRequest.mentee_id == mentee_id,
+    )
+    match_request = await _execute_transition(db, statement)
+    if match_request is not None:
+        note_write(mentee_id)
+        await events.publish_match_request("cancelled", match_request)
     return match_request
@@ -1,19 +1,270 @@
-from sqlalchemy import create_engine
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app import metrics
+from app.cache import TTLCache, USER_CACHE_MAX_ENTRIES
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./app.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+# Comma-separated read replicas serving read-only endpoints; empty = everything on the primary
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_SELECTION = os.getenv("REPLICA_SELECTION", "round_robin")  # or "least_loaded"
+# Keep a user on the primary this long after they write (0 disables read-your-writes)
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+# Schema work at startup: "none" leaves it to the deploy step (`python main.py --migrate`),
+# "migrate" has every worker run the upgrade in its lifespan, one at a time
+SCHEMA_SETUP = os.getenv("SCHEMA_SETUP", "none")
+# pg_advisory_lock key held while migrating; any constant shared by the app's processes
+SCHEMA_LOCK_KEY = 0x6D656E74
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Request-path connection pool; recycle/pre-ping/statement timeout only apply to server databases
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds before a connection is replaced
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 disables the limit
+
+# SQLite performance profile applied to every new connection; set a value to "" to skip that pragma
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "true").lower() in ("1", "true", "yes")
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),  # readers no longer block the writer
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),  # safe with WAL, far fewer fsyncs
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),  # wait for locks instead of failing
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-20000"),  # negative = KiB, i.e. ~20MB page cache
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    "foreign_keys": os.getenv("SQLITE_FOREIGN_KEYS", "ON"),
+}
+
+# Async drivers used by the request path for each sync dialect
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    if parsed.get_dialect().is_async:
+        return url
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+pool_checkout_wait = metrics.Timer()
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+def _is_memory_sqlite(parsed) -> bool:
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def engine_options(url: str) -> dict:
+    """create_engine / create_async_engine keyword arguments for ``url``."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    is_async = parsed.get_dialect().is_async
+    options = {}
+    
+    if backend == "sqlite" and not is_async:
+        options["connect_args"] = {"check_same_thread": False}
+    if is_async and not _is_memory_sqlite(parsed):
+        # aiosqlite would otherwise default to NullPool and open a connection per session
+        options.update(
+            poolclass=TimedAsyncQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+    if backend != "sqlite":
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+    if backend == "postgresql" and DB_STATEMENT_TIMEOUT_MS:
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def apply_sqlite_pragmas(engine, pragmas: dict = SQLITE_PRAGMAS) -> None:
+    """Run the SQLite pragmas on each connection the engine opens (no-op for other backends)."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if sync_engine.dialect.name != "sqlite" or not SQLITE_TUNING:
+        return
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items() if value != ""]
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+ASYNC_DATABASE_URL = to_async_url(SQLALCHEMY_DATABASE_URL)
+
+# Sync engine: schema management, Alembic and scripts
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: every request handler goes through this one
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+# expire_on_commit=False: attributes can't be lazily reloaded outside an await
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+apply_sqlite_pragmas(engine)
+apply_sqlite_pragmas(async_engine)
+
 Base = declarative_base()
 
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@contextmanager
+def schema_lock():
+    """Held while migrating so processes starting together upgrade one after another.
+
+    SQLite DDL is not transactional, so concurrent upgrades would fail part way
+    through; PostgreSQL gets an advisory lock, SQLite a lock file next to the database.
+    """
+    url = make_url(SQLALCHEMY_DATABASE_URL)
+    if url.get_backend_name() == "postgresql":
+        with engine.connect() as connection:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+    elif url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+        import fcntl
+
+        with open(f"{url.database}.migrate-lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    else:
+        yield
+
+
+def upgrade_schema() -> None:
+    """Bring the database at ``DATABASE_URL`` to the latest Alembic revision."""
+    from alembic import command
+    from alembic.config import Config
+
+    # Not alembic.ini: env.py would hand its logging section to fileConfig and mute uvicorn's loggers
+    config = Config()
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    with schema_lock():
+        # Tables made by create_all in builds before Alembic match 001_initial but carry no version,
+        # so upgrading would try to create them again
+        with engine.connect() as connection:
+            schema = inspect(connection)
+            unversioned = schema.has_table("users") and not schema.has_table("alembic_version")
+        if unversioned:
+            command.stamp(config, "001_initial")
+        command.upgrade(config, "head")
+
+
+class ReplicaRouter:
+    """Picks the replica engine for a read-only session."""
+
+    def __init__(self, engines: List, strategy: str = "round_robin"):
+        if strategy not in ("round_robin", "least_loaded"):
+            raise ValueError(f"Unknown replica selection strategy: {strategy}")
+        self.engines = engines
+        self.strategy = strategy
+        self._cycle = itertools.cycle(engines)
+        self._lock = threading.Lock()
+
+    def choose(self):
+        if self.strategy == "least_loaded":
+            return min(self.engines, key=lambda engine: engine.sync_engine.pool.checkedout())
+        with self._lock:
+            return next(self._cycle)
+
+
+def _create_replica_engine(url: str):
+    replica_url = to_async_url(url)
+    replica = create_async_engine(replica_url, **engine_options(replica_url))
+    apply_sqlite_pragmas(replica)
+    return replica
+
+
+replica_router: Optional[ReplicaRouter] = (
+    ReplicaRouter([_create_replica_engine(url) for url in DATABASE_REPLICA_URLS], REPLICA_SELECTION)
+    if DATABASE_REPLICA_URLS else None
+)
+# Sessions are bound to a replica engine when opened
+ReplicaSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+# user id -> marker; present while the user's own writes may not have reached the replicas
+_recent_writers = TTLCache(USER_CACHE_MAX_ENTRIES, READ_YOUR_WRITES_SECONDS)
+
+
+def note_write(user_id: int) -> None:
+    if READ_YOUR_WRITES_SECONDS > 0:
+        _recent_writers.set(user_id, True)
+
+
+def wrote_recently(user_id: Optional[int]) -> bool:
+    return user_id is not None and _recent_writers.get(user_id) is not None
+
+
+def _pool_stats() -> dict:
+    pool = async_engine.sync_engine.pool
+    stats = {"checkout_wait_seconds": pool_checkout_wait.snapshot()}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    return stats
+
+
+metrics.register("db_pool", _pool_stats)
+
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db(request: Request, primary=Depends(get_db)):
+    """Session for read-only endpoints: a replica unless the caller wrote recently.
 
-def get_db():
-    db = SessionLocal()
-    try:
+    The caller's id comes from ``request.state.user_id``, set by the auth
+    dependency, so declare the auth dependency before this one.
+    """
+    if replica_router is None or wrote_recently(getattr(request.state, "user_id", None)):
+        yield primary
+        return
+    async with ReplicaSessionLocal(bind=replica_router.choose()) as db:
         yield db
-    finally:
-        db.close()
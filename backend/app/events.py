@@ -0,0 +1,145 @@
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional, Set
+from starlette.websockets import WebSocket, WebSocketDisconnect
+from app import metrics
+from app.projections import match_request_projection
+
+# Undelivered events a subscriber may lag behind before it is disconnected to resync
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+
+# WebSocket close codes
+WS_TRY_AGAIN_LATER = 1013  # consumer fell behind; reconnect and refetch the lists
+WS_POLICY_VIOLATION = 1008  # missing, invalid or expired token
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+class Subscription:
+    """Events of one channel, queued for a consumer on its own event loop."""
+
+    def __init__(self, channel: str, max_pending: int):
+        self.channel = channel
+        self.max_pending = max_pending
+        self.overflowed = False
+        self._loop = asyncio.get_running_loop()
+        self._queue: "asyncio.Queue[Optional[dict]]" = asyncio.Queue()
+
+    def deliver(self, event: dict) -> None:
+        # Publishers may run on another thread or loop; hop onto the consumer's loop
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # consumer's loop is gone; it will be unsubscribed shortly
+
+    def _put(self, event: dict) -> None:
+        if self.overflowed:
+            return
+        if self._queue.qsize() >= self.max_pending:
+            self.overflowed = True
+            self._queue.put_nowait(None)  # wake the consumer so it can disconnect
+        else:
+            self._queue.put_nowait(event)
+
+    async def get(self) -> Optional[dict]:
+        """Next event, or None once the consumer has fallen too far behind."""
+        return await self._queue.get()
+
+
+class InMemoryBroker:
+    """Pub/sub between the requests of this process.
+
+    A multi-node backend (e.g. Redis pub/sub) provides the same subscribe /
+    unsubscribe / publish / stats methods and is installed with ``set_broker``.
+    """
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self._subscriptions: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.published = 0
+        self.overflows = 0
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(channel, self.max_pending)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[subscription.channel]
+        if subscription.overflowed:
+            self.overflows += 1
+
+    async def publish(self, channel: str, event: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscriptions.get(channel, ()))
+            self.published += 1
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+        return {"subscribers": subscribers, "published": self.published, "overflows": self.overflows}
+
+
+broker = InMemoryBroker(EVENT_QUEUE_SIZE)
+
+
+def set_broker(new_broker) -> None:
+    global broker
+    broker = new_broker
+
+
+metrics.register("events", lambda: broker.stats())
+
+
+async def publish_match_request(event_type: str, match_request) -> None:
+    """Tell both sides of a match request that it was created or changed state."""
+    event = {
+        "type": f"match_request.{event_type}",
+        "request": match_request_projection().from_object(match_request),
+    }
+    await broker.publish(user_channel(match_request.mentor_id), event)
+    await broker.publish(user_channel(match_request.mentee_id), event)
+
+
+async def forward_to_websocket(websocket: WebSocket, subscription: Subscription, expires_at: float) -> None:
+    """Send events until the client leaves, falls behind or its token expires."""
+    async def send_events():
+        while True:
+            event = await subscription.get()
+            if event is None:
+                await websocket.close(code=WS_TRY_AGAIN_LATER)
+                return
+            await websocket.send_json(event)
+
+    async def wait_for_disconnect():
+        # Clients never send anything; reading is only how we notice they left
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = [asyncio.ensure_future(send_events()), asyncio.ensure_future(wait_for_disconnect())]
+    done, pending = await asyncio.wait(
+        tasks, timeout=max(0.0, expires_at - time.time()), return_when=asyncio.FIRST_COMPLETED
+    )
+    for task in pending:
+        task.cancel()
+    for task in done:
+        task.exception()  # a send to a vanished client is expected; don't log it as unretrieved
+    if not done:
+        try:
+            await websocket.close(code=WS_POLICY_VIOLATION, reason="Token has expired")
+        except (RuntimeError, WebSocketDisconnect):
+            pass
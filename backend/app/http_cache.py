@@ -0,0 +1,34 @@
+from email.utils import formatdate
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = _opaque_tag(etag)
+    return any(_opaque_tag(tag) == wanted for tag in if_none_match.split(","))
+
+
+def http_date(value: datetime) -> str:
+    # SQLite hands back naive datetimes holding UTC; timestamp() would read them as local time
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return formatdate(value.timestamp(), usegmt=True)
+
+
+# List bodies may be kept by the client but must be revalidated with If-None-Match on every use
+LIST_CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(collection: str, version: int) -> str:
+    """ETag of a list derived from its collection's version counter."""
+    return f'W/"{collection}.{version}"'
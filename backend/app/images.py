@@ -0,0 +1,161 @@
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Profile images live on disk, addressed by the SHA-256 of their bytes.
+IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "./data/images")
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(1024 * 1024)))  # 1MB per requirements
+# imageUrl is not content-addressed, so clients revalidate with the ETag once max-age lapses
+IMAGE_CACHE_CONTROL = f"public, max-age={int(os.getenv('IMAGE_CACHE_MAX_AGE', '300'))}"
+
+# Square bounding boxes (px) generated for every upload; served via ?size=
+THUMBNAIL_SIZES = (64, 128, 500)
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "2"))
+
+# Magic numbers of the formats we accept (.jpg / .png only)
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+)
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def sniff_image_type(data: bytes) -> Optional[str]:
+    for signature, mime_type in _SIGNATURES:
+        if data.startswith(signature):
+            return mime_type
+    return None
+
+
+def decode_image_payload(payload: str) -> Tuple[bytes, str]:
+    """Decode a base64 (optionally data-URL) upload and return (bytes, mime_type)."""
+    if payload.startswith("data:"):
+        _, _, payload = payload.partition(",")
+    try:
+        data = base64.b64decode(payload, validate=True)
+    except (binascii.Error, ValueError):
+        raise InvalidImage("Image must be base64 encoded")
+    if not data:
+        raise InvalidImage("Image is empty")
+    if len(data) > MAX_IMAGE_BYTES:
+        raise InvalidImage("Image exceeds the maximum size of 1MB")
+    mime_type = sniff_image_type(data)
+    if mime_type is None:
+        raise InvalidImage("Only .jpg and .png images are allowed")
+    return data, mime_type
+
+
+class BlobStore:
+    """Content-addressed file store: each blob is written once under its SHA-256."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, digest: str, variant: Optional[str] = None) -> str:
+        # Fan out into sub-directories so no single directory grows unbounded.
+        # Derived blobs (thumbnails) sit next to their original as "<digest>.<variant>".
+        name = digest if variant is None else f"{digest}.{variant}"
+        return os.path.join(self.root, digest[:2], digest[2:4], name)
+
+    def exists(self, digest: str, variant: Optional[str] = None) -> bool:
+        return os.path.exists(self.path_for(digest, variant))
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        if not self.exists(digest):
+            self._write(self.path_for(digest), data)
+        return digest
+
+    def put_variant(self, digest: str, variant: str, data: bytes) -> None:
+        self._write(self.path_for(digest, variant), data)
+
+    def _write(self, path: str, data: bytes) -> None:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def read(self, digest: str) -> bytes:
+        with open(self.path_for(digest), "rb") as blob:
+            return blob.read()
+
+
+blob_store = BlobStore(IMAGE_STORE_DIR)
+
+
+_thumbnail_executor = ThreadPoolExecutor(max_workers=THUMBNAIL_WORKERS, thread_name_prefix="thumbnail")
+_pending_thumbnails: Dict[str, Future] = {}
+_pending_lock = threading.Lock()
+
+
+def thumbnail_variant(size: int) -> str:
+    return f"{size}px"
+
+
+def generate_thumbnails(digest: str, mime_type: str) -> None:
+    """Render every THUMBNAIL_SIZES variant of a stored image (runs on the worker pool)."""
+    from PIL import Image  # Pillow is only needed by the thumbnail workers
+
+    image_format = "PNG" if mime_type == "image/png" else "JPEG"
+    with Image.open(blob_store.path_for(digest)) as original:
+        original.load()
+        for size in THUMBNAIL_SIZES:
+            if blob_store.exists(digest, thumbnail_variant(size)):
+                continue
+            thumbnail = original.copy()
+            thumbnail.thumbnail((size, size))  # keeps aspect ratio, never upscales
+            if image_format == "JPEG" and thumbnail.mode not in ("RGB", "L"):
+                thumbnail = thumbnail.convert("RGB")
+            buffer = io.BytesIO()
+            thumbnail.save(buffer, format=image_format, optimize=True)
+            blob_store.put_variant(digest, thumbnail_variant(size), buffer.getvalue())
+
+
+def _run_thumbnail_job(digest: str, mime_type: str) -> None:
+    try:
+        generate_thumbnails(digest, mime_type)
+    except Exception:
+        # Serving falls back to the original when a thumbnail is missing
+        logger.exception("Thumbnail generation failed for %s", digest)
+    finally:
+        with _pending_lock:
+            _pending_thumbnails.pop(digest, None)
+
+
+def schedule_thumbnails(digest: str, mime_type: str) -> Optional[Future]:
+    """Queue thumbnail generation without blocking the request; deduplicates by digest."""
+    if all(blob_store.exists(digest, thumbnail_variant(size)) for size in THUMBNAIL_SIZES):
+        return None
+    with _pending_lock:
+        future = _pending_thumbnails.get(digest)
+        if future is None:
+            future = _thumbnail_executor.submit(_run_thumbnail_job, digest, mime_type)
+            _pending_thumbnails[digest] = future
+        return future
+
+
+def wait_for_thumbnails(digest: str, timeout: Optional[float] = None) -> None:
+    with _pending_lock:
+        future = _pending_thumbnails.get(digest)
+    if future is not None:
+        future.result(timeout=timeout)
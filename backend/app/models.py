@@ -1,9 +1,37 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
+import json
+import orjson
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
 
+# SQLite stores CURRENT_TIMESTAMP as "YYYY-MM-DD HH:MM:SS" text; bind datetimes in the same
+# format so range and keyset comparisons against server-set timestamps compare like with like
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
+
+class JSONList(TypeDecorator):
+    """A list stored as JSON text.
+
+    Every row read is parsed with orjson, including uncached and streamed
+    mentor lists; only pages served from the mentor list cache skip it.
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        # stdlib formatting keeps new rows byte-identical to existing ones (the skill sort orders by this text)
+        return json.dumps(value) if value is not None else None
+
+    def process_result_value(self, value, dialect):
+        return orjson.loads(value) if value else None
+
 
 class UserRole(str, enum.Enum):
     MENTOR = "mentor"
@@ -14,6 +42,7 @@ class MatchRequestStatus(str, enum.Enum):
     PENDING = "pending"
     ACCEPTED = "accepted"
     REJECTED = "rejected"
+    CANCELLED = "cancelled"
 
 
 class User(Base):
@@ -25,14 +54,38 @@ class User(Base):
     name = Column(String, nullable=False)
     role = Column(Enum(UserRole), nullable=False)
     bio = Column(Text)
-    profile_image = Column(Text)  # Base64 encoded image
-    skills = Column(Text)  # JSON string for mentor skills
+    image_hash = Column(String(64))  # SHA-256 of the image blob in the image store
+    image_size = Column(Integer)
+    image_mime = Column(String)
+    skills = Column(JSONList)  # mentor skills, JSON text in the database
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # bump to revoke tokens
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # Keyset pagination of the mentor directory ordered by (name, id)
+        Index("ix_users_role_name_id", "role", "name", "id"),
+    )
+
     # Relationships
     sent_requests = relationship("MatchRequest", foreign_keys="MatchRequest.mentee_id", back_populates="mentee")
     received_requests = relationship("MatchRequest", foreign_keys="MatchRequest.mentor_id", back_populates="mentor")
+    skill_index = relationship("MentorSkill", back_populates="user", cascade="all, delete-orphan")
+
+
+class MentorSkill(Base):
+    """Inverted index of mentor skills, kept in sync with ``User.skills``."""
+    __tablename__ = "mentor_skills"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    skill = Column(String, primary_key=True)  # normalized (stripped, lower-cased) skill
+
+    __table_args__ = (
+        # Covers both exact and prefix lookups: skill -> user_id without touching users
+        Index("ix_mentor_skills_skill_user_id", "skill", "user_id"),
+    )
+
+    user = relationship("User", back_populates="skill_index")
 
 
 class MatchRequest(Base):
@@ -43,9 +96,39 @@ class MatchRequest(Base):
     mentee_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     message = Column(Text)
     status = Column(Enum(MatchRequestStatus), default=MatchRequestStatus.PENDING)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, onupdate=func.now())
+
+    __table_args__ = (
+        # Incoming/outgoing lists in (created_at, id) keyset order, unfiltered and by status;
+        # the (owner, status) prefix also serves the pending/accepted checks
+        Index("ix_match_requests_mentor_id_created_at_id", "mentor_id", "created_at", "id"),
+        Index("ix_match_requests_mentee_id_created_at_id", "mentee_id", "created_at", "id"),
+        Index("ix_match_requests_mentor_id_status_created_at_id", "mentor_id", "status", "created_at", "id"),
+        Index("ix_match_requests_mentee_id_status_created_at_id", "mentee_id", "status", "created_at", "id"),
+        # Business rules enforced by the database so concurrent writers can't both win
+        Index(
+            "uq_match_requests_pending_mentee", "mentee_id", unique=True,
+            sqlite_where=text("status = 'PENDING'"), postgresql_where=text("status = 'PENDING'"),
+        ),
+        Index(
+            "uq_match_requests_accepted_mentor", "mentor_id", unique=True,
+            sqlite_where=text("status = 'ACCEPTED'"), postgresql_where=text("status = 'ACCEPTED'"),
+        ),
+    )
 
     # Relationships
     mentor = relationship("User", foreign_keys=[mentor_id], back_populates="received_requests")
     mentee = relationship("User", foreign_keys=[mentee_id], back_populates="sent_requests")
+
+
+class CollectionVersion(Base):
+    """Change counter of a listed collection, bumped in the transaction that changes it.
+
+    List endpoints derive their ETag from it, so a conditional GET costs one
+    primary-key lookup.
+    """
+    __tablename__ = "collection_versions"
+
+    name = Column(String, primary_key=True)  # "mentors", "match_requests:<user id>"
+    version = Column(Integer, nullable=False, default=0, server_default="0")
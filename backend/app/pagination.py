@@ -0,0 +1,31 @@
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Type
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], types: Sequence[Type]) -> Optional[List[Any]]:
+    """Decode a cursor whose values must have ``types``, one per sort column."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise InvalidCursor("Cursor does not match the requested ordering")
+    for value, expected in zip(values, types):
+        # bool is an int subclass, but never a valid sort key
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise InvalidCursor("Cursor does not match the requested ordering")
+    return values
@@ -0,0 +1,93 @@
+"""Converters from selected columns to API response dicts.
+
+A projection names the columns a query should select and a converter that
+builds the response dict from each result tuple by position, so list
+endpoints never hydrate ORM instances or go through per-field attribute
+access. Converters are generated once per model, role and field set.
+"""
+from functools import lru_cache
+from typing import Callable, Dict, NamedTuple, Sequence, Tuple
+from app.models import User, MatchRequest, UserRole
+
+USER_FIELDS = ("id", "email", "role", "name", "bio", "imageUrl", "skills")
+# Nested under "profile" in user responses
+PROFILE_FIELDS = ("name", "bio", "imageUrl", "skills")
+# User fields read from a column, keyed by API field name
+USER_COLUMNS = {
+    "email": User.email,
+    "name": User.name,
+    "bio": User.bio,
+    "skills": User.skills,
+}
+
+MATCH_REQUEST_FIELDS = ("id", "mentorId", "menteeId", "message", "status")
+OUTGOING_MATCH_REQUEST_FIELDS = ("id", "mentorId", "menteeId", "status")
+MATCH_REQUEST_COLUMNS = {
+    "id": MatchRequest.id,
+    "mentorId": MatchRequest.mentor_id,
+    "menteeId": MatchRequest.mentee_id,
+    "message": MatchRequest.message,
+    "status": MatchRequest.status,
+}
+
+
+class Projection(NamedTuple):
+    columns: Tuple  # select these first, in this order; trailing extra columns are ignored
+    convert: Callable[[Sequence], dict]
+
+    def from_object(self, obj) -> dict:
+        """Convert an ORM instance that is already loaded."""
+        return self.convert([getattr(obj, column.key) for column in self.columns])
+
+
+def _compile(label: str, expression: str) -> Callable[[Sequence], dict]:
+    # Only field names and fixed strings from this module end up in the source
+    source = f"def convert(row):\n    return {expression}\n"
+    namespace: Dict[str, object] = {}
+    exec(compile(source, f"<projection {label}>", "exec"), namespace)
+    return namespace["convert"]
+
+
+@lru_cache(maxsize=None)
+def user_projection(role: UserRole, fields: Tuple[str, ...] = USER_FIELDS) -> Projection:
+    """``{id, email, role, profile: {name, bio, imageUrl, skills}}`` limited to ``fields``.
+
+    ``id`` is always included; ``skills`` only for mentors.
+    """
+    wants = set(fields)
+    if role != UserRole.MENTOR:
+        wants.discard("skills")
+    columns = (User.id,) + tuple(USER_COLUMNS[field] for field in USER_FIELDS if field in wants and field in USER_COLUMNS)
+    position = {column.key: index for index, column in enumerate(columns)}
+
+    def value(field: str) -> str:
+        if field == "role":
+            return repr(role.value)
+        if field == "imageUrl":
+            return f"{f'/images/{role.value}/'!r} + str(row[0])"
+        if field == "skills":
+            return f"(row[{position['skills']}] or [])"
+        return f"row[{position[field]}]"
+
+    top = ["'id': row[0]"] + [f"{field!r}: {value(field)}" for field in ("email", "role") if field in wants]
+    profile = [f"{field!r}: {value(field)}" for field in PROFILE_FIELDS if field in wants]
+    if profile:
+        top.append("'profile': {" + ", ".join(profile) + "}")
+    label = f"{role.value}:{','.join(field for field in USER_FIELDS if field in wants)}"
+    return Projection(columns, _compile(label, "{" + ", ".join(top) + "}"))
+
+
+@lru_cache(maxsize=None)
+def match_request_projection(fields: Tuple[str, ...] = MATCH_REQUEST_FIELDS) -> Projection:
+    """Match request dict limited to ``fields``.
+
+    Every projection reads the same column layout, so one query serves both
+    the incoming and the outgoing shape.
+    """
+    columns = tuple(MATCH_REQUEST_COLUMNS.values())
+    position = {field: index for index, field in enumerate(MATCH_REQUEST_COLUMNS)}
+    items = [
+        f"{field!r}: row[{position[field]}]" + (".value" if field == "status" else "")
+        for field in MATCH_REQUEST_FIELDS if field in fields
+    ]
+    return Projection(columns, _compile(f"match_request:{','.join(fields)}", "{" + ", ".join(items) + "}"))
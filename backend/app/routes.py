@@ -1,49 +1,77 @@
-import json
-import base64
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Response
-from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.auth import get_current_user, get_current_mentor, get_current_mentee
-from app.models import User, UserRole
+import os
+import orjson
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Response, Query, Header, WebSocket
+from fastapi.responses import RedirectResponse, FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_read_db
+from app.auth import get_current_user, get_current_mentor, get_current_mentee, authenticate_websocket
+from app.models import User, UserRole, MatchRequestStatus
 from app.schemas import (
     SignupRequest, LoginRequest, LoginResponse,
     MentorProfile, MenteeProfile, MentorProfileDetails, MenteeProfileDetails,
     UpdateMentorProfileRequest, UpdateMenteeProfileRequest,
-    MentorListItem, MatchRequestCreate, MatchRequest, MatchRequestOutgoing, MatchRequestIncoming,
+    MentorListItem, MatchRequestCreate, MatchRequestBatch, MatchRequest, MatchRequestOutgoing, MatchRequestIncoming,
+    UserResponse, MatchRequestResponse, OutgoingMatchRequestResponse, MatchRequestBatchResponse,
     ErrorResponse
 )
 from app.crud import (
-    get_user_by_email, create_user, authenticate_user,
+    get_user_by_email, get_user_image_info, create_user, authenticate_user,
     update_mentor_profile, update_mentee_profile,
-    get_mentors, create_match_request,
+    get_mentors, normalize_skill, create_match_request,
+    get_collection_version, MENTORS_COLLECTION, match_requests_collection,
     get_incoming_match_requests, get_outgoing_match_requests,
-    accept_match_request, reject_match_request, cancel_match_request
+    stream_mentors, stream_incoming_match_requests, stream_outgoing_match_requests,
+    accept_match_request, reject_match_request, cancel_match_request, process_match_requests
 )
 from app.auth import create_access_token
+from app.pagination import encode_cursor, decode_cursor, InvalidCursor
+from app.passwords import password_hasher, PasswordHasherBusy
+from app.images import (
+    blob_store, schedule_thumbnails, InvalidImage, IMAGE_CACHE_CONTROL, THUMBNAIL_SIZES, thumbnail_variant
+)
+from app.http_cache import etag_matches, http_date, weak_etag, LIST_CACHE_CONTROL
+from app.cache import mentor_list_cache
+from app.streaming import json_array, STREAM_BATCH_SIZE
+from app.compression import choose_encoding, compress, COMPRESSION_MIN_SIZE
+from app.projections import (
+    USER_FIELDS, OUTGOING_MATCH_REQUEST_FIELDS, user_projection, match_request_projection
+)
+from app import events
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 100
+
 
 @router.post("/signup", status_code=201)
-async def signup(user: SignupRequest, db: Session = Depends(get_db)):
+async def signup(user: SignupRequest, db: AsyncSession = Depends(get_db)):
     # Check if user already exists
-    if get_user_by_email(db, user.email):
+    if await get_user_by_email(db, user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
     
+    # bcrypt runs on the password pool so the event loop stays free
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+    
     # Create new user
     try:
-        created_user = create_user(db, user)
+        created_user = await create_user(db, user, hashed_password)
         return {"message": "User created successfully", "id": created_user.id}
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.post("/login", response_model=LoginResponse)
-async def login(user: LoginRequest, db: Session = Depends(get_db)):
+async def login(user: LoginRequest, db: AsyncSession = Depends(get_db)):
     # Authenticate user
-    authenticated_user = authenticate_user(db, user.email, user.password)
+    try:
+        authenticated_user = await authenticate_user(db, user.email, user.password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
     if not authenticated_user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
@@ -52,48 +80,54 @@ async def login(user: LoginRequest, db: Session = Depends(get_db)):
     return LoginResponse(token=access_token)
 
 
-@router.get("/me")
+@router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
-    if current_user.role == UserRole.MENTOR:
-        skills = json.loads(current_user.skills) if current_user.skills else []
-        return {
-            "id": current_user.id,
-            "email": current_user.email,
-            "role": current_user.role.value,
-            "profile": {
-                "name": current_user.name,
-                "bio": current_user.bio,
-                "imageUrl": f"/images/mentor/{current_user.id}",
-                "skills": skills
-            }
-        }
-    else:
-        return {
-            "id": current_user.id,
-            "email": current_user.email,
-            "role": current_user.role.value,
-            "profile": {
-                "name": current_user.name,
-                "bio": current_user.bio,
-                "imageUrl": f"/images/mentee/{current_user.id}"
-            }
-        }
+    return user_projection(current_user.role).from_object(current_user)
 
 
 @router.get("/images/{role}/{id}")
-async def get_profile_image(role: str, id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == id, User.role == role).first()
-    if not user:
+async def get_profile_image(
+    role: str,
+    id: int,
+    size: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    if size is not None and size not in THUMBNAIL_SIZES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"size must be one of {', '.join(str(s) for s in THUMBNAIL_SIZES)}"
+        )
+    
+    # Only the image metadata is loaded; the bytes are streamed from the blob store
+    image = await get_user_image_info(db, id, role)
+    if not image:
         raise HTTPException(status_code=404, detail="User not found")
     
-    if user.profile_image:
-        # Decode base64 image
-        try:
-            image_data = base64.b64decode(user.profile_image)
-            return Response(content=image_data, media_type="image/jpeg")
-        except Exception:
-            # If decoding fails, return default image
-            pass
+    if image.image_hash:
+        variant = thumbnail_variant(size) if size is not None else None
+        cache_control = IMAGE_CACHE_CONTROL
+        if variant is not None and not blob_store.exists(image.image_hash, variant):
+            # Thumbnail still being generated, or never queued (images moved in by migration 004,
+            # failed jobs): make sure it is on its way, and serve the original without letting it stick
+            if blob_store.exists(image.image_hash):
+                schedule_thumbnails(image.image_hash, image.image_mime)
+            variant = None
+            cache_control = "no-cache"
+        
+        etag = f'"{image.image_hash}"' if variant is None else f'"{image.image_hash}.{variant}"'
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        modified_at = image.updated_at or image.created_at
+        if modified_at is not None:
+            headers["Last-Modified"] = http_date(modified_at)
+        
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        
+        path = blob_store.path_for(image.image_hash, variant)
+        if os.path.exists(path):
+            return FileResponse(path, media_type=image.image_mime, headers=headers)
+        # If the blob is missing, return default image
     
     # Return default image based on role
     if role == "mentor":
@@ -104,189 +138,327 @@ async def get_profile_image(role: str, id: int, db: Session = Depends(get_db)):
     return RedirectResponse(url=default_url)
 
 
-@router.put("/profile")
+@router.put("/profile", response_model=UserResponse)
 async def update_profile(
     profile_data: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if current_user.role == UserRole.MENTOR:
         profile_request = UpdateMentorProfileRequest(**profile_data)
-        updated_user = update_mentor_profile(db, current_user.id, profile_request)
+        try:
+            updated_user = await update_mentor_profile(db, current_user.id, profile_request)
+        except InvalidImage as e:
+            raise HTTPException(status_code=400, detail=str(e))
         if not updated_user:
             raise HTTPException(status_code=400, detail="Failed to update profile")
         
-        skills = json.loads(updated_user.skills) if updated_user.skills else []
-        return {
-            "id": updated_user.id,
-            "email": updated_user.email,
-            "role": updated_user.role.value,
-            "profile": {
-                "name": updated_user.name,
-                "bio": updated_user.bio,
-                "imageUrl": f"/images/mentor/{updated_user.id}",
-                "skills": skills
-            }
-        }
+        return user_projection(updated_user.role).from_object(updated_user)
     else:
         profile_request = UpdateMenteeProfileRequest(**profile_data)
-        updated_user = update_mentee_profile(db, current_user.id, profile_request)
+        try:
+            updated_user = await update_mentee_profile(db, current_user.id, profile_request)
+        except InvalidImage as e:
+            raise HTTPException(status_code=400, detail=str(e))
         if not updated_user:
             raise HTTPException(status_code=400, detail="Failed to update profile")
         
-        return {
-            "id": updated_user.id,
-            "email": updated_user.email,
-            "role": updated_user.role.value,
-            "profile": {
-                "name": updated_user.name,
-                "bio": updated_user.bio,
-                "imageUrl": f"/images/mentee/{updated_user.id}"
-            }
-        }
+        return user_projection(updated_user.role).from_object(updated_user)
+
+
+def _parse_mentor_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return list(USER_FIELDS)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in USER_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+
+async def _list_validators(db: AsyncSession, collection: str) -> Tuple[int, dict]:
+    """Current version of a listed collection and the ETag/Cache-Control headers derived from it."""
+    # Read before any rows: a concurrent write can then only leave the ETag older than the body
+    version = await get_collection_version(db, collection)
+    return version, {"ETag": weak_etag(collection, version), "Cache-Control": LIST_CACHE_CONTROL}
+
+
+def _mentor_page_response(cache_key, body: bytes, headers: dict, accept_encoding: Optional[str]) -> Response:
+    # Compressed variants are cached next to the plain body so a hot page is compressed once;
+    # the compression middleware leaves responses that already have a Content-Encoding alone,
+    # so Vary is set here for those and by the middleware for everything else
+    encoding = choose_encoding(accept_encoding) if len(body) >= COMPRESSION_MIN_SIZE else None
+    if encoding is not None:
+        variant_key = cache_key + (encoding,)
+        # The page lookup already counted towards the cache stats
+        cached = mentor_list_cache.get(variant_key, count=False)
+        if cached is None:
+            cached = (compress(body, encoding), {})
+            mentor_list_cache.set(variant_key, *cached)
+        body = cached[0]
+        headers = {**headers, "Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+    return Response(body, media_type="application/json", headers=headers)
 
 
 @router.get("/mentors")
 async def get_mentors_list(
     skill: Optional[str] = None,
     order_by: Optional[str] = None,
+    skill_prefix: bool = False,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
     current_user: User = Depends(get_current_mentee),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    mentors = get_mentors(db, skill, order_by)
-    mentor_list = []
+    version, headers = await _list_validators(db, MENTORS_COLLECTION)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    requested = _parse_mentor_fields(fields)
+    # name and skill pages are keyed by (sort text, id), the default order by id alone
+    keyset_types = (str, int) if order_by in ("name", "skill") else (int,)
+    try:
+        after = decode_cursor(cursor, keyset_types)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Same directory version + same query = same bytes
+    cache_key = (
+        version, normalize_skill(skill) if skill else None, order_by, skill_prefix,
+        tuple(requested), limit, cursor
+    )
+    cached = mentor_list_cache.get(cache_key)
+    if cached is not None:
+        body, page_headers = cached
+        return _mentor_page_response(cache_key, body, {**headers, **page_headers}, accept_encoding)
+    
+    projection = user_projection(UserRole.MENTOR, tuple(sorted(set(requested))))
+    if limit is None:
+        # Unpaginated (export) requests are streamed in batches instead of built in memory;
+        # the body is still cached if it turns out small enough
+        partitions = stream_mentors(
+            db, skill, order_by, skill_prefix,
+            columns=projection.columns, after=after, batch_size=STREAM_BATCH_SIZE
+        )
+        body = json_array(partitions, projection.convert, sink=mentor_list_cache.writer(cache_key, {}))
+        return StreamingResponse(body, media_type="application/json", headers=headers)
     
-    for mentor in mentors:
-        skills = json.loads(mentor.skills) if mentor.skills else []
-        mentor_list.append({
-            "id": mentor.id,
-            "email": mentor.email,
-            "role": mentor.role.value,
-            "profile": {
-                "name": mentor.name,
-                "bio": mentor.bio,
-                "imageUrl": f"/images/mentor/{mentor.id}",
-                "skills": skills
-            }
-        })
+    # Fetch one extra row to learn whether another page exists
+    rows = await get_mentors(
+        db, skill, order_by, skill_prefix,
+        columns=projection.columns, after=after, limit=limit + 1
+    )
+    page_headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        key = [last.sort_key, last.id] if len(keyset_types) == 2 else [last.id]
+        page_headers["X-Next-Cursor"] = encode_cursor(key)
     
-    return mentor_list
+    mentor_list = [projection.convert(row) for row in rows]
+    
+    # Serialized once per version and query
+    body = orjson.dumps(mentor_list)
+    mentor_list_cache.set(cache_key, body, page_headers)
+    return _mentor_page_response(cache_key, body, {**headers, **page_headers}, accept_encoding)
 
 
-@router.post("/match-requests")
+@router.post("/match-requests", response_model=MatchRequestResponse)
 async def create_match_request_endpoint(
     request: MatchRequestCreate,
     current_user: User = Depends(get_current_mentee),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # API 문서에 따라 menteeId가 포함되지만, 보안상 토큰에서 추출한 사용자 ID 사용
     if request.menteeId != current_user.id:
         raise HTTPException(status_code=403, detail="Cannot create request for another user")
     
-    match_request = create_match_request(db, current_user.id, request)
+    match_request = await create_match_request(db, current_user.id, request)
     if not match_request:
         raise HTTPException(status_code=400, detail="Unable to create match request")
     
-    return {
-        "id": match_request.id,
-        "mentorId": match_request.mentor_id,
-        "menteeId": match_request.mentee_id,
-        "message": match_request.message,
-        "status": match_request.status.value
-    }
+    return match_request_projection().from_object(match_request)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Timestamps are stored in UTC; naive input is taken to be UTC already
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _decode_request_cursor(cursor: Optional[str]) -> Optional[list]:
+    try:
+        after = decode_cursor(cursor, (str, int))
+        if after is not None:
+            after = [_as_utc(datetime.fromisoformat(after[0])), int(after[1])]
+    except (InvalidCursor, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Malformed cursor")
+    return after
+
+
+async def _match_request_page(list_requests, response, owner_id, db, status, since, limit, cursor):
+    after = _decode_request_cursor(cursor)
+    # Fetch one extra row to learn whether another page exists
+    rows = await list_requests(
+        db, owner_id, status=status,
+        since=_as_utc(since) if since is not None else None,
+        after=after, limit=limit + 1 if limit is not None else None
+    )
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor([rows[-1].created_at.isoformat(), rows[-1].id])
+    return rows
+
 
+def _match_request_stream(stream_requests, projection, owner_id, db, status, since, cursor, headers):
+    after = _decode_request_cursor(cursor)
+    partitions = stream_requests(
+        db, owner_id, status=status,
+        since=_as_utc(since) if since is not None else None,
+        after=after, batch_size=STREAM_BATCH_SIZE
+    )
+    return StreamingResponse(json_array(partitions, projection.convert), media_type="application/json", headers=headers)
 
-@router.get("/match-requests/incoming")
+
+@router.get("/match-requests/incoming", response_model=List[MatchRequestResponse])
 async def get_incoming_requests(
+    response: Response,
+    status: Optional[MatchRequestStatus] = None,
+    since: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_mentor),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    requests = get_incoming_match_requests(db, current_user.id)
-    result = []
-    
-    for req in requests:
-        result.append({
-            "id": req.id,
-            "mentorId": req.mentor_id,
-            "menteeId": req.mentee_id,
-            "message": req.message,
-            "status": req.status.value
-        })
+    _, headers = await _list_validators(db, match_requests_collection(current_user.id))
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if limit is None:
+        # Unpaginated lists are streamed in batches instead of built in memory
+        return _match_request_stream(
+            stream_incoming_match_requests, match_request_projection(), current_user.id, db, status, since, cursor, headers
+        )
+    response.headers.update(headers)
     
-    return result
+    requests = await _match_request_page(
+        get_incoming_match_requests, response, current_user.id, db, status, since, limit, cursor
+    )
+    project = match_request_projection().convert
+    return [project(row) for row in requests]
 
 
-@router.get("/match-requests/outgoing")
+@router.get("/match-requests/outgoing", response_model=List[OutgoingMatchRequestResponse])
 async def get_outgoing_requests(
+    response: Response,
+    status: Optional[MatchRequestStatus] = None,
+    since: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_mentee),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    requests = get_outgoing_match_requests(db, current_user.id)
-    result = []
+    _, headers = await _list_validators(db, match_requests_collection(current_user.id))
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if limit is None:
+        # Unpaginated lists are streamed in batches instead of built in memory
+        return _match_request_stream(
+            stream_outgoing_match_requests, match_request_projection(OUTGOING_MATCH_REQUEST_FIELDS), current_user.id, db, status, since, cursor, headers
+        )
+    response.headers.update(headers)
     
-    for req in requests:
-        result.append({
-            "id": req.id,
-            "mentorId": req.mentor_id,
-            "menteeId": req.mentee_id,
-            "status": req.status.value
-        })
+    requests = await _match_request_page(
+        get_outgoing_match_requests, response, current_user.id, db, status, since, limit, cursor
+    )
+    project = match_request_projection(OUTGOING_MATCH_REQUEST_FIELDS).convert
+    return [project(row) for row in requests]
+
+
+@router.websocket("/match-requests/events")
+async def match_request_events(websocket: WebSocket, db: AsyncSession = Depends(get_db)):
+    # 폴링 대신 생성/수락/거절/취소 이벤트를 멘토와 멘티에게 푸시
+    payload = await authenticate_websocket(websocket, db)
+    # Don't hold a pooled connection for the lifetime of the socket
+    await db.close()
+    if payload is None:
+        await websocket.close(code=events.WS_POLICY_VIOLATION)
+        return
     
-    return result
+    subscription = events.broker.subscribe(events.user_channel(int(payload.get("sub"))))
+    try:
+        await websocket.accept()
+        await events.forward_to_websocket(websocket, subscription, payload["exp"])
+    finally:
+        events.broker.unsubscribe(subscription)
 
 
-@router.put("/match-requests/{request_id}/accept")
+@router.put("/match-requests/{request_id}/accept", response_model=MatchRequestResponse)
 async def accept_request(
     request_id: int,
     current_user: User = Depends(get_current_mentor),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    match_request = accept_match_request(db, request_id, current_user.id)
+    match_request = await accept_match_request(db, request_id, current_user.id)
     if not match_request:
         raise HTTPException(status_code=404, detail="Match request not found or already processed")
     
-    return {
-        "id": match_request.id,
-        "mentorId": match_request.mentor_id,
-        "menteeId": match_request.mentee_id,
-        "message": match_request.message,
-        "status": match_request.status.value
-    }
+    return match_request_projection().from_object(match_request)
 
 
-@router.put("/match-requests/{request_id}/reject")
+@router.put("/match-requests/{request_id}/reject", response_model=MatchRequestResponse)
 async def reject_request(
     request_id: int,
     current_user: User = Depends(get_current_mentor),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    match_request = reject_match_request(db, request_id, current_user.id)
+    match_request = await reject_match_request(db, request_id, current_user.id)
     if not match_request:
         raise HTTPException(status_code=404, detail="Match request not found or already processed")
     
-    return {
-        "id": match_request.id,
-        "mentorId": match_request.mentor_id,
-        "menteeId": match_request.mentee_id,
-        "message": match_request.message,
-        "status": match_request.status.value
-    }
+    return match_request_projection().from_object(match_request)
+
+
+# Fields a result doesn't have are left out rather than sent as null
+@router.post("/match-requests/batch", response_model=MatchRequestBatchResponse, response_model_exclude_unset=True)
+async def process_requests(
+    batch: MatchRequestBatch,
+    current_user: User = Depends(get_current_mentor),
+    db: AsyncSession = Depends(get_db)
+):
+    # 중복 ID는 한 번만 처리하되 요청 순서는 유지
+    request_ids = list(dict.fromkeys(batch.ids))
+    status = MatchRequestStatus.ACCEPTED if batch.action == "accept" else MatchRequestStatus.REJECTED
+    updated, current = await process_match_requests(db, current_user.id, request_ids, status)
+    
+    projection = match_request_projection()
+    updated_by_id = {match_request.id: match_request for match_request in updated}
+    results = []
+    for request_id in request_ids:
+        match_request = updated_by_id.get(request_id)
+        if match_request is not None:
+            results.append(projection.from_object(match_request))
+        elif request_id not in current:
+            results.append({"id": request_id, "error": "Match request not found"})
+        elif current[request_id] == MatchRequestStatus.PENDING:
+            results.append({"id": request_id, "status": "pending", "error": "Mentor already has an accepted request"})
+        else:
+            results.append({"id": request_id, "status": current[request_id].value, "error": "Match request already processed"})
+    
+    return {"results": results}
 
 
-@router.delete("/match-requests/{request_id}")
+@router.delete("/match-requests/{request_id}", response_model=MatchRequestResponse)
 async def cancel_request(
     request_id: int,
     current_user: User = Depends(get_current_mentee),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    match_request = cancel_match_request(db, request_id, current_user.id)
+    match_request = await cancel_match_request(db, request_id, current_user.id)
     if not match_request:
         raise HTTPException(status_code=404, detail="Match request not found")
     
-    return {
-        "id": match_request.id,
-        "mentorId": match_request.mentor_id,
-        "menteeId": match_request.mentee_id,
-        "message": match_request.message,
-        "status": match_request.status.value
-    }
+    return match_request_projection().from_object(match_request)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, ConfigDict, Field
+from typing import Literal, Optional, List, Union
 from datetime import datetime
 from app.models import UserRole, MatchRequestStatus
 
@@ -63,6 +63,25 @@ class UpdateMenteeProfileRequest(BaseModel):
     image: Optional[str] = None  # Base64 encoded image
 
 
+# Profile responses (GET /me, PUT /profile)
+class MenteeProfileBody(BaseModel):
+    name: str
+    bio: Optional[str] = None
+    imageUrl: str
+
+
+class MentorProfileBody(MenteeProfileBody):
+    skills: List[str]
+
+
+class UserResponse(BaseModel):
+    id: int
+    email: str
+    role: UserRole
+    # Mentor first: a mentee profile would also accept a mentor's dict by ignoring skills
+    profile: Union[MentorProfileBody, MenteeProfileBody]
+
+
 # Mentor listing schemas
 class MentorListItem(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -80,6 +99,44 @@ class MatchRequestCreate(BaseModel):
     message: Optional[str] = None
 
 
+# Ids a mentor may process in one batch call
+MAX_BATCH_SIZE = 500
+
+
+class MatchRequestBatch(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+    action: Literal["accept", "reject"]
+
+
+class MatchRequestResponse(BaseModel):
+    id: int
+    mentorId: int
+    menteeId: int
+    message: Optional[str] = None
+    status: MatchRequestStatus
+
+
+class OutgoingMatchRequestResponse(BaseModel):
+    id: int
+    mentorId: int
+    menteeId: int
+    status: MatchRequestStatus
+
+
+class MatchRequestBatchResult(BaseModel):
+    # Processed ids carry the updated request; the others only an error and, if known, the current status
+    id: int
+    mentorId: Optional[int] = None
+    menteeId: Optional[int] = None
+    message: Optional[str] = None
+    status: Optional[MatchRequestStatus] = None
+    error: Optional[str] = None
+
+
+class MatchRequestBatchResponse(BaseModel):
+    results: List[MatchRequestBatchResult]
+
+
 class MatchRequest(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     
@@ -0,0 +1,36 @@
+"""Incremental JSON arrays for list endpoints that return every row."""
+import os
+from typing import AsyncIterator, Callable, Optional, Sequence
+import orjson
+from app.cache import ResponseCacheWriter
+
+# Rows fetched per round trip and encoded per chunk when a list is streamed
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+
+async def json_array(
+    partitions: AsyncIterator[Sequence],
+    convert: Callable[[Sequence], dict],
+    sink: Optional[ResponseCacheWriter] = None
+) -> AsyncIterator[bytes]:
+    """Encode batches of rows as one JSON array, a chunk per batch.
+
+    ``sink`` (e.g. a response cache writer) sees every chunk and is closed
+    only if the whole array was produced.
+    """
+    chunk = b"["
+    separator = b""
+    async for rows in partitions:
+        if not rows:
+            continue
+        chunk += separator + b",".join([orjson.dumps(convert(row)) for row in rows])
+        separator = b","
+        if sink is not None:
+            sink.write(chunk)
+        yield chunk
+        chunk = b""
+    chunk += b"]"
+    if sink is not None:
+        sink.write(chunk)
+        sink.close()
+    yield chunk
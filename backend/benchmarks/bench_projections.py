@@ -0,0 +1,72 @@
+"""Mentor list conversion: hydrated ``User`` instances vs compiled projections.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_projections --mentors 10000 --repeat 5
+
+Both variants read the same mentors from an in-memory SQLite database and
+build the ``GET /api/mentors`` response dicts; the time includes the query.
+"""
+import argparse
+import timeit
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.models import User, UserRole
+from app.projections import user_projection
+
+
+def _seed(session: Session, mentors: int) -> None:
+    session.execute(insert(User), [
+        {
+            "email": f"mentor{i}@bench.test", "hashed_password": "x", "name": f"Mentor {i}",
+            "role": UserRole.MENTOR, "bio": "Bio " * 10, "skills": ["Python", "React", "Go"],
+        }
+        for i in range(mentors)
+    ])
+    session.commit()
+
+
+def hydrated(session: Session) -> list:
+    # Per-field attribute access on ORM instances, as the routes did before projections
+    session.expunge_all()
+    result = []
+    for mentor in session.scalars(select(User).where(User.role == UserRole.MENTOR).order_by(User.id)):
+        result.append({
+            "id": mentor.id,
+            "email": mentor.email,
+            "role": mentor.role.value,
+            "profile": {
+                "name": mentor.name,
+                "bio": mentor.bio,
+                "imageUrl": f"/images/mentor/{mentor.id}",
+                "skills": mentor.skills or [],
+            },
+        })
+    return result
+
+
+def projected(session: Session) -> list:
+    projection = user_projection(UserRole.MENTOR)
+    rows = session.execute(select(*projection.columns).where(User.role == UserRole.MENTOR).order_by(User.id))
+    return [projection.convert(row) for row in rows]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mentors", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        _seed(session, args.mentors)
+        assert hydrated(session) == projected(session)
+        for variant in (hydrated, projected):
+            best = min(timeit.repeat(lambda: variant(session), number=1, repeat=args.repeat))
+            print(f"{variant.__name__:>10}: {best * 1000:8.1f} ms  ({best / args.mentors * 1e6:.2f} us/mentor)")
+
+
+if __name__ == "__main__":
+    main()
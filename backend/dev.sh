@@ -11,6 +11,7 @@ show_help() {
     echo "Commands:"
     echo "  setup       Set up the development environment"
     echo "  start       Start the development server"
+    echo "  migrate     Upgrade the database schema to the latest revision"
     echo "  test        Run all tests"
     echo "  test-v      Run tests with verbose output"
     echo "  test-cov    Run tests with coverage report"
@@ -36,6 +37,12 @@ start_server() {
     ./start_server.sh
 }
 
+migrate_db() {
+    echo "🗄️ Applying database migrations..."
+    source venv/bin/activate
+    python main.py --migrate
+}
+
 run_tests() {
     echo "🧪 Running tests..."
     case "$1" in
@@ -118,6 +125,9 @@ case "$1" in
     "start")
         start_server
         ;;
+    "migrate")
+        migrate_db
+        ;;
     "test")
         run_tests "$2"
         ;;
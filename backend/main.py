@@ -1,17 +1,41 @@
+import time
+
+_started = time.perf_counter()
+
+import argparse
+import asyncio
+import sys
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
-from app.database import engine, Base
+from fastapi.responses import RedirectResponse, ORJSONResponse
+from app.database import SCHEMA_SETUP, upgrade_schema
 from app.routes import router
+from app import metrics
+from app.cache import cache_backend
+from app.compression import CompressionMiddleware
 import uvicorn
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+_imported = time.perf_counter()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if SCHEMA_SETUP == "migrate":
+        # Alembic's engine is synchronous; keep it off the event loop
+        await asyncio.to_thread(upgrade_schema)
+    # Subscribes to cross-worker cache invalidations when a shared backend is configured
+    await cache_backend.start()
+    yield
+    await cache_backend.close()
+
 
 app = FastAPI(
     title="Mentor-Mentee Matching API",
     description="API for matching mentors and mentees in a mentoring platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -24,6 +48,9 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# gzip/brotli for JSON bodies; images are served as stored
+app.add_middleware(CompressionMiddleware)
+
 # Include API routes
 app.include_router(router, prefix="/api")
 
@@ -40,11 +67,42 @@ async def swagger_ui():
     return RedirectResponse(url="/docs")
 
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Pool, cache and other runtime counters"""
+    return metrics.snapshot()
+
+
 @app.get("/openapi.json")
 async def get_openapi():
     """Get OpenAPI specification"""
     return app.openapi()
 
 
+_app_built = time.perf_counter()
+
+
+async def _check_startup() -> None:
+    """Time each startup phase of a worker and exit."""
+    lifespan_started = time.perf_counter()
+    async with lifespan(app):
+        ready = time.perf_counter()
+    print(f"imports        {(_imported - _started) * 1000:8.1f} ms")
+    print(f"app setup      {(_app_built - _imported) * 1000:8.1f} ms")
+    print(f"lifespan       {(ready - lifespan_started) * 1000:8.1f} ms  (SCHEMA_SETUP={SCHEMA_SETUP})")
+    print(f"total          {(ready - _started) * 1000:8.1f} ms")
+    deferred = [module for module in ("passlib", "jose", "alembic", "redis") if module not in sys.modules]
+    print(f"not loaded     {', '.join(deferred) or '-'}")
+
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8080)
+    parser = argparse.ArgumentParser(description="Mentor-Mentee Matching API server")
+    parser.add_argument("--check-startup", action="store_true", help="report how long startup takes, then exit")
+    parser.add_argument("--migrate", action="store_true", help="upgrade the database schema to head, then exit")
+    args = parser.parse_args()
+    if args.migrate:
+        upgrade_schema()
+    elif args.check_startup:
+        asyncio.run(_check_startup())
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8080)
@@ -54,7 +54,7 @@ fi
 echo "🗄️ Setting up database..."
 if [ -f "alembic.ini" ]; then
     echo "Running database migrations..."
-    alembic upgrade head
+    python main.py --migrate
 else
     echo "No Alembic configuration found, database will be created automatically."
 fi
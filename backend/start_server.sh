@@ -29,6 +29,10 @@ if ! command -v uvicorn &> /dev/null; then
     pip install -r requirements.txt
 fi
 
+# Workers don't migrate on their own (SCHEMA_SETUP=none), so upgrade once before starting them
+echo "🗄️ Applying database migrations..."
+python main.py --migrate
+
 # Start the server
 echo "🌟 Starting FastAPI server on http://localhost:8080"
 echo "📚 API Documentation: http://localhost:8080/docs"
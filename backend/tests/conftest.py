@@ -1,31 +1,69 @@
+import os
+import tempfile
 import pytest
 import uuid
+from contextlib import contextmanager
+
+# Keep uploaded test images out of the real image store
+os.environ.setdefault("IMAGE_STORE_DIR", tempfile.mkdtemp(prefix="test-images-"))
+# Minimum bcrypt cost keeps signup/login fixtures fast
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# The test fixtures create the schema themselves; don't migrate app.db when the app starts
+os.environ.setdefault("SCHEMA_SETUP", "none")
+
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from app.database import get_db, Base
+from sqlalchemy.pool import NullPool
+from app.database import get_db, Base, to_async_url, engine_options, apply_sqlite_pragmas
 from app.models import User, UserRole
+from app.cache import mentor_list_cache
 from main import app
 
-# Create test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Create test database (set TEST_DATABASE_URL to run against e.g. PostgreSQL)
+SQLALCHEMY_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite:///./test.db")
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Each TestClient runs its own event loop, so don't pool connections across them
+async_engine = create_async_engine(to_async_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+apply_sqlite_pragmas(engine)
+apply_sqlite_pragmas(async_engine)
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
+
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 app.dependency_overrides[get_db] = override_get_db
 
 
+@contextmanager
+def capture_sql(engine, with_parameters=False):
+    """Collect the SQL ``engine`` runs inside the block, as ``(statement, parameters)`` with ``with_parameters``"""
+    captured = []
+    target = getattr(engine, "sync_engine", engine)
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters) if with_parameters else statement)
+
+    event.listen(target, "before_cursor_execute", record)
+    try:
+        yield captured
+    finally:
+        event.remove(target, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def sql_statements():
+    """SQL the app runs against the test database while the test runs"""
+    with capture_sql(async_engine) as captured:
+        yield captured
+
+
 @pytest.fixture(scope="function")
 def test_db():
     """Create test database for each test function"""
@@ -37,6 +75,8 @@ def test_db():
         db.execute(table.delete())
     db.commit()
     db.close()
+    # Collection versions restart with the emptied tables; don't serve pages cached under them
+    mentor_list_cache.clear()
 
 
 @pytest.fixture
@@ -112,3 +152,28 @@ def auth_headers_mentor(mentor_token):
 def auth_headers_mentee(mentee_token):
     """Auth headers for mentee"""
     return {"Authorization": f"Bearer {mentee_token}"}
+
+
+@pytest.fixture
+def signup_and_login(client):
+    """Factory that creates a user and returns (user_id, auth headers)"""
+    def _signup_and_login(role, name):
+        unique_id = str(uuid.uuid4())[:8]
+        user_data = {
+            "email": f"{role}{unique_id}@test.com",
+            "password": "testpassword123",
+            "name": name,
+            "role": role
+        }
+        signup_response = client.post("/api/signup", json=user_data)
+        assert signup_response.status_code == 201
+
+        login_response = client.post("/api/login", json={
+            "email": user_data["email"],
+            "password": user_data["password"]
+        })
+        assert login_response.status_code == 200
+        headers = {"Authorization": f"Bearer {login_response.json()['token']}"}
+        return signup_response.json()["id"], headers
+
+    return _signup_and_login
@@ -0,0 +1,120 @@
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app import compression
+from app.cache import mentor_list_cache
+from app.compression import CompressionMiddleware, choose_encoding
+
+BIO = "I mentor people on backend systems, databases and everything in between. " * 8
+
+
+def _app():
+    async def json_body(request):
+        return Response(b'{"bio": "%s"}' % BIO.encode(), media_type="application/json")
+
+    async def small(request):
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    async def image(request):
+        return Response(b"\x89PNG" + b"\x00" * 2000, media_type="image/png")
+
+    async def streamed(request):
+        async def chunks():
+            for _ in range(3):
+                yield BIO.encode()
+        return StreamingResponse(chunks(), media_type="application/json")
+
+    app = Starlette(routes=[
+        Route("/json", json_body), Route("/small", small), Route("/image", image), Route("/streamed", streamed)
+    ])
+    return TestClient(CompressionMiddleware(app, minimum_size=500))
+
+
+class TestChooseEncoding:
+    """Test Accept-Encoding negotiation"""
+
+    def test_preference_and_weights(self):
+        """Test brotli is preferred, q-values are honoured and q=0 refuses a coding"""
+        assert choose_encoding("gzip, deflate, br") == "br"
+        assert choose_encoding("gzip;q=1.0, br;q=0.5") == "gzip"
+        assert choose_encoding("br;q=0, *") == "gzip"
+        assert choose_encoding("identity") is None
+        assert choose_encoding(None) is None
+
+
+class TestCompressionMiddleware:
+    """Test which responses get compressed"""
+
+    def test_gzip_large_json(self):
+        """Test large JSON bodies are compressed with a matching Content-Length"""
+        response = _app().get("/json", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert int(response.headers["Content-Length"]) < len(BIO)
+        assert BIO in response.text
+
+    def test_brotli(self):
+        """Test brotli is used when the client offers it"""
+        response = _app().get("/json", headers={"Accept-Encoding": "gzip, br"})
+
+        assert response.headers["Content-Encoding"] == "br"
+        assert BIO in response.text
+
+    def test_skips_small_bodies_images_and_identity(self):
+        """Test small bodies, images and clients without Accept-Encoding get the body as is"""
+        client = _app()
+
+        small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in small.headers
+        assert small.headers["Vary"] == "Accept-Encoding"
+
+        image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in image.headers
+        assert "Vary" not in image.headers
+
+        plain = client.get("/json", headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in plain.headers
+
+    def test_streamed_body(self):
+        """Test streamed bodies are compressed chunk by chunk without a Content-Length"""
+        response = _app().get("/streamed", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in response.headers
+        assert response.text == BIO * 3
+
+
+class TestPrecompressedMentorPages:
+    """Test cached mentor pages are compressed once"""
+
+    def test_variant_is_cached(self, client, signup_and_login):
+        """Test pages are served from the stored gzip body, never compressed by the middleware"""
+        for i in range(3):
+            _, mentor_headers = signup_and_login("mentor", f"Verbose Mentor {i}")
+            client.put("/api/profile", json={"name": f"Verbose Mentor {i}", "bio": BIO}, headers=mentor_headers)
+        _, headers = signup_and_login("mentee", "Reader")
+        headers = {**headers, "Accept-Encoding": "gzip"}
+
+        compressed_by_middleware = compression.stats.responses
+        first = client.get("/api/mentors?limit=10", headers=headers)
+        hits = mentor_list_cache.hits
+        second = client.get("/api/mentors?limit=10", headers=headers)
+
+        assert first.headers["Content-Encoding"] == second.headers["Content-Encoding"] == "gzip"
+        assert second.headers["Vary"] == "Accept-Encoding"
+        assert second.json() == first.json()
+        assert len(second.json()) == 3
+        assert compression.stats.responses == compressed_by_middleware
+        assert mentor_list_cache.hits == hits + 1  # variant lookups don't count
+
+    def test_vary_is_sent_once(self, client, signup_and_login):
+        """Test small uncompressed pages get a single Vary from the middleware"""
+        signup_and_login("mentor", "Terse Mentor")
+        _, headers = signup_and_login("mentee", "Reader")
+
+        response = client.get("/api/mentors?limit=10", headers={**headers, "Accept-Encoding": "gzip"})
+
+        assert "Content-Encoding" not in response.headers
+        assert response.headers.get_list("Vary") == ["Accept-Encoding"]
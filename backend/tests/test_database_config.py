@@ -0,0 +1,50 @@
+import pytest
+from app import metrics
+from app.database import engine_options, to_async_url, TimedAsyncQueuePool
+
+
+class TestDatabaseConfig:
+    """Test engine configuration derived from the database URL"""
+
+    def test_async_url_for_each_backend(self):
+        """Test the async driver picked for sync URLs"""
+        assert to_async_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+        assert to_async_url("postgresql://user:secret@db/app") == "postgresql+asyncpg://user:secret@db/app"
+        assert to_async_url("sqlite+aiosqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+
+    def test_postgres_gets_pool_settings_and_statement_timeout(self, monkeypatch):
+        """Test pool sizing, pre-ping, recycle and statement timeout for server databases"""
+        monkeypatch.setattr("app.database.DB_STATEMENT_TIMEOUT_MS", 5000)
+
+        sync_options = engine_options("postgresql://user:secret@db/app")
+        async_options = engine_options("postgresql+asyncpg://user:secret@db/app")
+
+        assert sync_options["pool_pre_ping"] is True
+        assert {"pool_size", "max_overflow", "pool_timeout", "pool_recycle"} <= set(sync_options)
+        assert sync_options["connect_args"] == {"options": "-c statement_timeout=5000"}
+        assert async_options["poolclass"] is TimedAsyncQueuePool
+        assert async_options["connect_args"] == {"server_settings": {"statement_timeout": "5000"}}
+
+    def test_sqlite_file_uses_timed_queue_pool(self):
+        """Test that aiosqlite file databases are pooled instead of NullPool"""
+        assert engine_options("sqlite+aiosqlite:///./app.db")["poolclass"] is TimedAsyncQueuePool
+        assert "poolclass" not in engine_options("sqlite+aiosqlite://")
+        assert "pool_pre_ping" not in engine_options("sqlite:///./app.db")
+
+    def test_pool_checkout_wait_is_reported(self, client):
+        """Test that /metrics exposes pool checkout wait time"""
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        wait = response.json()["db_pool"]["checkout_wait_seconds"]
+        assert {"count", "sum", "max", "buckets"} <= set(wait)
+
+    def test_timer_histogram_is_cumulative(self):
+        """Test bucket counts accumulate up to +Inf"""
+        timer = metrics.Timer(buckets=(0.1, 1.0))
+        for seconds in (0.05, 0.5, 2.0):
+            timer.observe(seconds)
+
+        snapshot = timer.snapshot()
+        assert snapshot["buckets"] == {"0.1": 1, "1.0": 2, "+Inf": 3}
+        assert snapshot["max"] == 2.0
@@ -0,0 +1,70 @@
+class TestMentorListETag:
+    """Test conditional GETs of the mentor directory"""
+
+    def test_not_modified_skips_the_query(self, client, signup_and_login, sql_statements):
+        """Test a matching If-None-Match gets an empty 304 without listing mentors"""
+        _, headers = signup_and_login("mentee", "ETag Mentee")
+        first = client.get("/api/mentors", headers=headers)
+        etag = first.headers["ETag"]
+        assert etag.startswith('W/"')
+        sql_statements.clear()
+
+        response = client.get("/api/mentors", headers={**headers, "If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        assert not any("WHERE users.role" in statement for statement in sql_statements)
+
+    def test_changes_when_mentors_change(self, client, signup_and_login):
+        """Test new mentors and mentor profile edits produce a new ETag"""
+        _, headers = signup_and_login("mentee", "Watcher")
+        etag = client.get("/api/mentors", headers=headers).headers["ETag"]
+
+        _, mentor_headers = signup_and_login("mentor", "New Mentor")
+        after_signup = client.get("/api/mentors", headers={**headers, "If-None-Match": etag})
+        assert after_signup.status_code == 200
+        assert after_signup.headers["ETag"] != etag
+
+        client.put("/api/profile", json={"name": "Renamed Mentor", "skills": ["Go"]}, headers=mentor_headers)
+        after_update = client.get("/api/mentors", headers={**headers, "If-None-Match": after_signup.headers["ETag"]})
+        assert after_update.status_code == 200
+        assert "Renamed Mentor" in after_update.text
+
+    def test_mentee_changes_keep_etag(self, client, signup_and_login):
+        """Test writes that don't touch the directory leave the ETag valid"""
+        _, headers = signup_and_login("mentee", "Quiet Mentee")
+        etag = client.get("/api/mentors", headers=headers).headers["ETag"]
+
+        client.put("/api/profile", json={"name": "Still Quiet"}, headers=headers)
+
+        assert client.get("/api/mentors", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+
+class TestMatchRequestListETag:
+    """Test conditional GETs of incoming/outgoing requests"""
+
+    def test_incoming_and_outgoing(self, client, signup_and_login, sql_statements):
+        """Test both sides' ETags change with a request and 304 never reads match_requests"""
+        mentor_id, mentor_headers = signup_and_login("mentor", "Polled Mentor")
+        mentee_id, mentee_headers = signup_and_login("mentee", "Polling Mentee")
+        incoming = client.get("/api/match-requests/incoming", headers=mentor_headers).headers["ETag"]
+        outgoing = client.get("/api/match-requests/outgoing", headers=mentee_headers).headers["ETag"]
+
+        sql_statements.clear()
+        assert client.get("/api/match-requests/incoming",
+                          headers={**mentor_headers, "If-None-Match": incoming}).status_code == 304
+        assert not any("FROM match_requests" in statement for statement in sql_statements)
+
+        created = client.post("/api/match-requests", json={
+            "mentorId": mentor_id, "menteeId": mentee_id, "message": "hi"
+        }, headers=mentee_headers).json()
+        response = client.get("/api/match-requests/incoming", headers={**mentor_headers, "If-None-Match": incoming})
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()] == [created["id"]]
+
+        outgoing_after_create = client.get("/api/match-requests/outgoing", headers=mentee_headers).headers["ETag"]
+        assert outgoing_after_create != outgoing
+        client.put(f"/api/match-requests/{created['id']}/accept", headers=mentor_headers)
+        assert client.get("/api/match-requests/outgoing",
+                          headers={**mentee_headers, "If-None-Match": outgoing_after_create}).status_code == 200
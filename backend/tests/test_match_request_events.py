@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+import pytest
+from starlette.websockets import WebSocketDisconnect
+from app import events
+from app.events import InMemoryBroker, WS_POLICY_VIOLATION
+
+
+def _token(headers):
+    return headers["Authorization"].split(" ", 1)[1]
+
+
+class TestMatchRequestEventStream:
+    """Test match request events pushed over the WebSocket"""
+
+    def test_both_sides_receive_events(self, client, signup_and_login):
+        """Test mentor and mentee are told about creation and acceptance"""
+        mentor_id, mentor_headers = signup_and_login("mentor", "Event Mentor")
+        mentee_id, mentee_headers = signup_and_login("mentee", "Event Mentee")
+
+        with client.websocket_connect(f"/api/match-requests/events?token={_token(mentor_headers)}") as mentor_ws, \
+                client.websocket_connect("/api/match-requests/events", headers=mentee_headers) as mentee_ws:
+            created = client.post("/api/match-requests", json={
+                "mentorId": mentor_id, "menteeId": mentee_id, "message": "hi"
+            }, headers=mentee_headers).json()
+            client.put(f"/api/match-requests/{created['id']}/accept", headers=mentor_headers)
+
+            for ws in (mentor_ws, mentee_ws):
+                first, second = ws.receive_json(), ws.receive_json()
+                assert first["type"] == "match_request.created"
+                assert first["request"] == {**created, "status": "pending"}
+                assert second["type"] == "match_request.accepted"
+                assert second["request"]["status"] == "accepted"
+
+    def test_other_users_see_nothing(self, client, signup_and_login):
+        """Test events only go to the two users involved"""
+        mentor_id, _ = signup_and_login("mentor", "Busy Mentor")
+        mentee_id, mentee_headers = signup_and_login("mentee", "Busy Mentee")
+        bystander_id, bystander_headers = signup_and_login("mentor", "Bystander")
+        other_mentee_id, other_mentee_headers = signup_and_login("mentee", "Other Mentee")
+
+        with client.websocket_connect("/api/match-requests/events", headers=bystander_headers) as bystander_ws, \
+                client.websocket_connect("/api/match-requests/events", headers=mentee_headers) as mentee_ws:
+            client.post("/api/match-requests", json={
+                "mentorId": mentor_id, "menteeId": mentee_id, "message": "hi"
+            }, headers=mentee_headers)
+            assert mentee_ws.receive_json()["type"] == "match_request.created"
+            client.post("/api/match-requests", json={
+                "mentorId": bystander_id, "menteeId": other_mentee_id, "message": "hello"
+            }, headers=other_mentee_headers)
+            # The first event the bystander sees is the one addressed to them
+            assert bystander_ws.receive_json()["request"]["mentorId"] == bystander_id
+
+        # Server-side handlers finish on the client's event loop after the sockets close
+        deadline = time.monotonic() + 2
+        while events.broker.stats()["subscribers"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert events.broker.stats()["subscribers"] == 0
+
+    def test_rejects_missing_or_invalid_token(self, client):
+        """Test the handshake is refused without a valid token"""
+        for url in ("/api/match-requests/events", "/api/match-requests/events?token=garbage"):
+            with pytest.raises(WebSocketDisconnect) as excinfo:
+                with client.websocket_connect(url):
+                    pass
+            assert excinfo.value.code == WS_POLICY_VIOLATION
+
+
+class TestInMemoryBroker:
+    """Test the in-process pub/sub backend"""
+
+    def test_publish_from_another_thread(self):
+        """Test events published off the subscriber's loop are delivered"""
+        broker = InMemoryBroker(max_pending=10)
+
+        async def scenario():
+            subscription = broker.subscribe("user:1")
+            thread = threading.Thread(target=asyncio.run, args=(broker.publish("user:1", {"n": 1}),))
+            thread.start()
+            thread.join()
+            return await asyncio.wait_for(subscription.get(), timeout=1)
+
+        assert asyncio.run(scenario()) == {"n": 1}
+
+    def test_slow_consumer_is_cut_off(self):
+        """Test a subscriber that falls behind gets None instead of unbounded buffering"""
+        broker = InMemoryBroker(max_pending=2)
+
+        async def scenario():
+            subscription = broker.subscribe("user:1")
+            for n in range(5):
+                await broker.publish("user:1", {"n": n})
+            await asyncio.sleep(0)
+            received = [await subscription.get() for _ in range(3)]
+            broker.unsubscribe(subscription)
+            return received
+
+        assert asyncio.run(scenario()) == [{"n": 0}, {"n": 1}, None]
+        assert broker.stats() == {"subscribers": 0, "published": 5, "overflows": 1}
@@ -0,0 +1,92 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+
+
+@pytest.fixture
+def inbox(client, signup_and_login):
+    """A mentor with four incoming requests: two pending, one rejected, one cancelled"""
+    mentor_id, mentor_headers = signup_and_login("mentor", "Inbox Mentor")
+    request_ids = []
+    for i in range(4):
+        mentee_id, mentee_headers = signup_and_login("mentee", f"Inbox Mentee {i}")
+        response = client.post("/api/match-requests", json={
+            "mentorId": mentor_id, "menteeId": mentee_id, "message": f"request {i}"
+        }, headers=mentee_headers)
+        request_ids.append(response.json()["id"])
+        if i == 2:
+            client.put(f"/api/match-requests/{response.json()['id']}/reject", headers=mentor_headers)
+        if i == 3:
+            client.delete(f"/api/match-requests/{response.json()['id']}", headers=mentee_headers)
+    return mentor_headers, request_ids
+
+
+class TestMatchRequestLists:
+    """Test filtering and keyset pagination of incoming/outgoing requests"""
+
+    def test_unpaginated_list_is_ordered(self, client, inbox):
+        """Test every request is returned oldest first without a limit"""
+        headers, request_ids = inbox
+
+        response = client.get("/api/match-requests/incoming", headers=headers)
+
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()] == request_ids
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_status_filter(self, client, inbox):
+        """Test only requests in the given status are returned"""
+        headers, request_ids = inbox
+
+        pending = client.get("/api/match-requests/incoming?status=pending", headers=headers).json()
+        cancelled = client.get("/api/match-requests/incoming?status=cancelled", headers=headers).json()
+
+        assert [item["id"] for item in pending] == request_ids[:2]
+        assert [item["id"] for item in cancelled] == [request_ids[3]]
+
+    def test_keyset_pagination_visits_every_row_once(self, client, inbox):
+        """Test walking pages of one; rows share a created_at second so ties fall back to id"""
+        headers, request_ids = inbox
+        seen, cursor = [], None
+
+        while True:
+            url = "/api/match-requests/incoming?limit=1" + (f"&cursor={cursor}" if cursor else "")
+            response = client.get(url, headers=headers)
+            seen += [item["id"] for item in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert seen == request_ids
+
+    def test_since(self, client, inbox):
+        """Test since= keeps requests created at or after the given time"""
+        headers, request_ids = inbox
+        past = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+        future = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+
+        assert len(client.get("/api/match-requests/incoming", params={"since": past}, headers=headers).json()) == 4
+        assert client.get("/api/match-requests/incoming", params={"since": future}, headers=headers).json() == []
+
+    def test_outgoing_status_filter(self, client, signup_and_login):
+        """Test the mentee's outgoing list is filtered the same way"""
+        mentor_id, _ = signup_and_login("mentor", "Outgoing Mentor")
+        mentee_id, headers = signup_and_login("mentee", "Outgoing Mentee")
+        first = client.post("/api/match-requests", json={
+            "mentorId": mentor_id, "menteeId": mentee_id, "message": "hi"
+        }, headers=headers).json()
+        client.delete(f"/api/match-requests/{first['id']}", headers=headers)
+        second = client.post("/api/match-requests", json={
+            "mentorId": mentor_id, "menteeId": mentee_id, "message": "again"
+        }, headers=headers).json()
+
+        pending = client.get("/api/match-requests/outgoing?status=pending", headers=headers).json()
+
+        assert [item["id"] for item in pending] == [second["id"]]
+
+    def test_malformed_cursor(self, client, inbox):
+        """Test a garbage cursor is a client error"""
+        headers, _ = inbox
+
+        response = client.get("/api/match-requests/incoming?cursor=not-a-cursor", headers=headers)
+
+        assert response.status_code == 400
@@ -0,0 +1,174 @@
+import asyncio
+import uuid
+import pytest
+from sqlalchemy.exc import IntegrityError
+from app import crud
+from app.models import MatchRequest, MatchRequestStatus, UserRole
+from app.schemas import SignupRequest, MatchRequestCreate
+from tests.conftest import TestingAsyncSessionLocal
+
+
+async def _create_user(role):
+    async with TestingAsyncSessionLocal() as db:
+        user = await crud.create_user(db, SignupRequest(
+            email=f"{role.value}{uuid.uuid4().hex[:8]}@test.com", password="x", name="Race", role=role
+        ), hashed_password="x")
+        return user.id
+
+
+async def _create_request(mentor_id, mentee_id, message="hi"):
+    async with TestingAsyncSessionLocal() as db:
+        return await crud.create_match_request(db, mentee_id, MatchRequestCreate(
+            mentorId=mentor_id, menteeId=mentee_id, message=message
+        ))
+
+
+async def _accept(request_id, mentor_id):
+    async with TestingAsyncSessionLocal() as db:
+        return await crud.accept_match_request(db, request_id, mentor_id)
+
+
+class TestMatchRequestTransitions:
+    """Test that match request state changes are atomic"""
+
+    def test_concurrent_creates_leave_one_pending(self, test_db):
+        """Test a mentee racing two requests ends up with exactly one pending"""
+        async def scenario():
+            mentor_id = await _create_user(UserRole.MENTOR)
+            mentee_id = await _create_user(UserRole.MENTEE)
+            return await asyncio.gather(*(_create_request(mentor_id, mentee_id, str(i)) for i in range(5)))
+
+        results = asyncio.run(scenario())
+
+        assert len([result for result in results if result is not None]) == 1
+
+    def test_concurrent_accepts_leave_one_accepted(self, test_db):
+        """Test a mentor racing two accepts ends up with exactly one accepted"""
+        async def scenario():
+            mentor_id = await _create_user(UserRole.MENTOR)
+            requests = []
+            for _ in range(2):
+                mentee_id = await _create_user(UserRole.MENTEE)
+                requests.append(await _create_request(mentor_id, mentee_id))
+            return await asyncio.gather(*(_accept(request.id, mentor_id) for request in requests))
+
+        results = asyncio.run(scenario())
+
+        accepted = [result for result in results if result is not None]
+        assert len(accepted) == 1
+        assert accepted[0].status == MatchRequestStatus.ACCEPTED
+
+    def test_create_requires_existing_mentor(self, test_db):
+        """Test the insert is skipped when the target is not a mentor"""
+        async def scenario():
+            mentee_id = await _create_user(UserRole.MENTEE)
+            other_mentee_id = await _create_user(UserRole.MENTEE)
+            return await _create_request(other_mentee_id, mentee_id)
+
+        assert asyncio.run(scenario()) is None
+
+    def test_partial_unique_index_rejects_second_pending(self, test_db):
+        """Test the database itself refuses a second pending request per mentee"""
+        async def scenario():
+            mentor_id = await _create_user(UserRole.MENTOR)
+            mentee_id = await _create_user(UserRole.MENTEE)
+            async with TestingAsyncSessionLocal() as db:
+                db.add_all([
+                    MatchRequest(mentor_id=mentor_id, mentee_id=mentee_id, status=MatchRequestStatus.PENDING),
+                    MatchRequest(mentor_id=mentor_id, mentee_id=mentee_id, status=MatchRequestStatus.PENDING),
+                ])
+                await db.commit()
+
+        with pytest.raises(IntegrityError):
+            asyncio.run(scenario())
+
+    def test_cancel_endpoint(self, client, signup_and_login):
+        """Test cancelling sets the status to cancelled and frees the pending slot"""
+        mentor_id, _ = signup_and_login("mentor", "Cancel Mentor")
+        mentee_id, mentee_headers = signup_and_login("mentee", "Cancel Mentee")
+        body = {"mentorId": mentor_id, "menteeId": mentee_id, "message": "hi"}
+
+        created = client.post("/api/match-requests", json=body, headers=mentee_headers).json()
+        response = client.delete(f"/api/match-requests/{created['id']}", headers=mentee_headers)
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "cancelled"
+        assert client.post("/api/match-requests", json=body, headers=mentee_headers).status_code == 200
+
+
+class TestBatchProcessing:
+    """Test the bulk accept/reject endpoint"""
+
+    def _inbox(self, client, signup_and_login, size):
+        mentor_id, mentor_headers = signup_and_login("mentor", "Busy Mentor")
+        request_ids = []
+        for i in range(size):
+            mentee_id, mentee_headers = signup_and_login("mentee", f"Mentee {i}")
+            response = client.post("/api/match-requests", json={
+                "mentorId": mentor_id, "menteeId": mentee_id, "message": "hi"
+            }, headers=mentee_headers)
+            request_ids.append(response.json()["id"])
+        return mentor_headers, request_ids
+
+    def test_bulk_reject(self, client, signup_and_login):
+        """Test every pending request is rejected and reported in request order"""
+        mentor_headers, request_ids = self._inbox(client, signup_and_login, 3)
+
+        response = client.post("/api/match-requests/batch", json={
+            "ids": list(reversed(request_ids)), "action": "reject"
+        }, headers=mentor_headers)
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [result["id"] for result in results] == list(reversed(request_ids))
+        assert all(result["status"] == "rejected" and "error" not in result for result in results)
+
+    def test_bulk_accept_takes_first_pending(self, client, signup_and_login):
+        """Test only one request is accepted since a mentor holds a single match"""
+        mentor_headers, request_ids = self._inbox(client, signup_and_login, 3)
+
+        results = client.post("/api/match-requests/batch", json={
+            "ids": [request_ids[1], request_ids[0], request_ids[2]], "action": "accept"
+        }, headers=mentor_headers).json()["results"]
+
+        assert results[0] == {**results[0], "id": request_ids[1], "status": "accepted"}
+        assert all(result["error"] == "Mentor already has an accepted request" for result in results[1:])
+
+    def test_per_item_errors(self, client, signup_and_login):
+        """Test processed, foreign and duplicate ids get individual results"""
+        mentor_headers, request_ids = self._inbox(client, signup_and_login, 2)
+        other_headers, other_ids = self._inbox(client, signup_and_login, 1)
+        client.put(f"/api/match-requests/{request_ids[0]}/reject", headers=mentor_headers)
+
+        results = client.post("/api/match-requests/batch", json={
+            "ids": [request_ids[0], request_ids[1], request_ids[1], other_ids[0]], "action": "reject"
+        }, headers=mentor_headers).json()["results"]
+
+        assert results == [
+            {"id": request_ids[0], "status": "rejected", "error": "Match request already processed"},
+            {**results[1], "id": request_ids[1], "status": "rejected"},
+            {"id": other_ids[0], "error": "Match request not found"},
+        ]
+        assert "error" not in results[1]
+
+    def test_batch_is_mentor_only_and_bounded(self, client, signup_and_login):
+        """Test mentees are refused and empty batches are invalid"""
+        mentor_headers, _ = self._inbox(client, signup_and_login, 0)
+        _, mentee_headers = signup_and_login("mentee", "Nosy Mentee")
+
+        assert client.post("/api/match-requests/batch", json={"ids": [1], "action": "reject"},
+                           headers=mentee_headers).status_code == 403
+        assert client.post("/api/match-requests/batch", json={"ids": [], "action": "reject"},
+                           headers=mentor_headers).status_code == 422
+        assert client.post("/api/match-requests/batch", json={"ids": [1], "action": "cancel"},
+                           headers=mentor_headers).status_code == 422
+
+    def test_batch_results_are_documented(self, client):
+        """Test the batch response schema is published in OpenAPI"""
+        spec = client.get("/openapi.json").json()
+
+        response = spec["paths"]["/api/match-requests/batch"]["post"]["responses"]["200"]
+        assert response["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/MatchRequestBatchResponse"}
+        assert set(spec["components"]["schemas"]["MatchRequestBatchResult"]["properties"]) == {
+            "id", "mentorId", "menteeId", "message", "status", "error"
+        }
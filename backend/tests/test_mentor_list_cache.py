@@ -0,0 +1,74 @@
+from app.cache import ResponseCache, mentor_list_cache
+
+
+class TestMentorListCache:
+    """Test the versioned /mentors response cache"""
+
+    def test_repeat_request_is_served_from_cache(self, client, signup_and_login, sql_statements):
+        """Test the second identical request neither queries nor rebuilds the page"""
+        signup_and_login("mentor", "Cached Mentor")
+        _, headers = signup_and_login("mentee", "Reader")
+
+        first = client.get("/api/mentors?limit=1", headers=headers)
+        hits = mentor_list_cache.hits
+        second = client.get("/api/mentors?limit=1", headers=headers)
+
+        assert second.content == first.content
+        assert second.headers["ETag"] == first.headers["ETag"]
+        assert mentor_list_cache.hits == hits + 1
+        assert sum("WHERE users.role" in statement for statement in sql_statements) == 1
+
+    def test_queries_are_cached_separately(self, client, signup_and_login):
+        """Test skill, ordering and page are part of the key"""
+        mentor_id, mentor_headers = signup_and_login("mentor", "Skilled Mentor")
+        client.put("/api/profile", json={"name": "Skilled Mentor", "skills": ["Rust"]}, headers=mentor_headers)
+        signup_and_login("mentor", "Other Mentor")
+        _, headers = signup_and_login("mentee", "Reader")
+
+        everyone = client.get("/api/mentors", headers=headers).json()
+        rust = client.get("/api/mentors?skill=rust", headers=headers).json()
+
+        assert len(everyone) == 2
+        assert [mentor["id"] for mentor in rust] == [mentor_id]
+
+    def test_invalidated_by_mentor_changes(self, client, signup_and_login):
+        """Test profile edits and new mentors are visible immediately"""
+        _, mentor_headers = signup_and_login("mentor", "Before")
+        _, headers = signup_and_login("mentee", "Reader")
+        client.get("/api/mentors", headers=headers)
+
+        client.put("/api/profile", json={"name": "After"}, headers=mentor_headers)
+        assert [m["profile"]["name"] for m in client.get("/api/mentors", headers=headers).json()] == ["After"]
+
+        signup_and_login("mentor", "Newcomer")
+        assert len(client.get("/api/mentors", headers=headers).json()) == 2
+
+    def test_hit_rate_in_metrics(self, client):
+        """Test cache counters are exported"""
+        stats = client.get("/metrics").json()["mentor_list_cache"]
+
+        assert {"entries", "bytes", "hits", "misses", "evictions", "hit_rate"} <= set(stats)
+
+
+class TestResponseCache:
+    """Test the byte-bounded LRU"""
+
+    def test_evicts_least_recently_used_by_size(self):
+        """Test total body size stays under the limit"""
+        cache = ResponseCache(max_bytes=10)
+        cache.set("a", b"1234", {})
+        cache.set("b", b"1234", {})
+        cache.get("a")
+        cache.set("c", b"1234", {})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == (b"1234", {})
+        assert cache.bytes == 8
+        assert cache.evictions == 1
+
+    def test_oversized_bodies_are_not_cached(self):
+        """Test a body larger than the whole budget is skipped"""
+        cache = ResponseCache(max_bytes=4)
+        cache.set("big", b"12345", {})
+
+        assert len(cache) == 0
@@ -0,0 +1,68 @@
+import pytest
+from app.pagination import encode_cursor
+
+
+class TestMentorPagination:
+    """Test keyset pagination and field projection on the mentor list"""
+
+    def _collect_pages(self, client, headers, query):
+        pages, cursor = [], None
+        while True:
+            url = f"/api/mentors?{query}" + (f"&cursor={cursor}" if cursor else "")
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200
+            pages.append(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return pages
+
+    def test_pages_by_id(self, client, signup_and_login, auth_headers_mentee):
+        """Test walking the directory two mentors at a time in id order"""
+        ids = [signup_and_login("mentor", f"Mentor {i}")[0] for i in range(5)]
+
+        pages = self._collect_pages(client, auth_headers_mentee, "limit=2")
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert [mentor["id"] for page in pages for mentor in page] == sorted(ids)
+
+    def test_pages_by_name_with_duplicate_names(self, client, signup_and_login, auth_headers_mentee):
+        """Test that (name, id) keyset ordering neither skips nor repeats ties"""
+        for name in ["Charlie", "Alice", "Bob", "Alice", "Bob"]:
+            signup_and_login("mentor", name)
+
+        pages = self._collect_pages(client, auth_headers_mentee, "order_by=name&limit=2")
+
+        names = [mentor["profile"]["name"] for page in pages for mentor in page]
+        assert names == ["Alice", "Alice", "Bob", "Bob", "Charlie"]
+        assert len({mentor["id"] for page in pages for mentor in page}) == 5
+
+    def test_field_projection_skips_bio(self, client, signup_and_login, auth_headers_mentee):
+        """Test that fields= limits the payload to the requested fields"""
+        _, headers = signup_and_login("mentor", "Projected Mentor")
+        client.put("/api/profile", json={"name": "Projected Mentor", "bio": "Long bio", "skills": ["Go"]}, headers=headers)
+
+        response = client.get("/api/mentors?fields=name,skills", headers=auth_headers_mentee)
+
+        assert response.status_code == 200
+        mentor = response.json()[0]
+        assert set(mentor) == {"id", "profile"}
+        assert mentor["profile"] == {"name": "Projected Mentor", "skills": ["Go"]}
+
+    def test_invalid_fields_and_cursor_rejected(self, client, auth_headers_mentee):
+        """Test that unknown fields and malformed cursors return 400"""
+        assert client.get("/api/mentors?fields=password", headers=auth_headers_mentee).status_code == 400
+        assert client.get("/api/mentors?cursor=not-a-cursor", headers=auth_headers_mentee).status_code == 400
+
+    @pytest.mark.parametrize("query, values", [
+        ("", [{"a": 1}]),
+        ("", ["x"]),
+        ("", [True]),
+        ("order_by=name&", [[1], 2]),
+        ("order_by=skill&", ["Go", "2"]),
+        ("order_by=name&", [3]),
+    ])
+    def test_cursor_with_wrong_value_types_rejected(self, client, auth_headers_mentee, query, values):
+        """Test cursors whose values don't fit the ordering's sort key return 400"""
+        response = client.get(f"/api/mentors?{query}limit=2&cursor={encode_cursor(values)}", headers=auth_headers_mentee)
+
+        assert response.status_code == 400
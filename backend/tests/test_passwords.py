@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import pytest
+from app.passwords import PasswordHasher, PasswordHasherBusy, BCRYPT_ROUNDS, _crypt_context
+
+
+class TestPasswordHasher:
+    """Test the bounded bcrypt worker pool"""
+
+    def test_hash_and_verify_round_trip(self):
+        """Test hashing on the pool with the configured cost"""
+        hasher = PasswordHasher(workers=2, max_pending=4)
+
+        async def run():
+            hashed = await hasher.hash("secret-password")
+            return hashed, await hasher.verify("secret-password", hashed), await hasher.verify("wrong", hashed)
+
+        hashed, ok, wrong = asyncio.run(run())
+        assert ok is True
+        assert wrong is False
+        assert _crypt_context().identify(hashed) == "bcrypt"
+        assert f"${BCRYPT_ROUNDS:02d}$" in hashed
+
+    def test_rejects_work_beyond_max_pending(self, monkeypatch):
+        """Test that a full queue fails fast instead of piling up"""
+        hasher = PasswordHasher(workers=1, max_pending=1)
+        release = threading.Event()
+        monkeypatch.setattr("app.passwords.get_password_hash", lambda password: release.wait(5) and "hashed")
+
+        async def run():
+            first = asyncio.ensure_future(hasher.hash("one"))
+            await asyncio.sleep(0.05)
+            with pytest.raises(PasswordHasherBusy):
+                await hasher.hash("two")
+            release.set()
+            return await first
+
+        assert asyncio.run(run()) == "hashed"
+        assert hasher.pending == 0
+
+    def test_signup_returns_503_when_pool_is_full(self, client, monkeypatch):
+        """Test that signup sheds load with 503 and Retry-After"""
+        monkeypatch.setattr("app.passwords.password_hasher.max_pending", 0)
+
+        response = client.post("/api/signup", json={
+            "email": "busy@test.com", "password": "whatever", "name": "Busy", "role": "mentee"
+        })
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
@@ -0,0 +1,206 @@
+import io
+import os
+import time
+import base64
+import pytest
+from datetime import datetime
+from app.http_cache import http_date
+from app.images import blob_store, wait_for_thumbnails, thumbnail_variant, THUMBNAIL_SIZES
+from tests.conftest import TestingSessionLocal
+from app.models import User
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+JPEG_BYTES = b"\xff\xd8\xff\xe0" + b"\x00" * 64
+
+
+class TestProfileImageStore:
+    """Test profile images stored in the content-addressed blob store"""
+
+    def test_uploaded_image_is_stored_by_hash(self, client, signup_and_login):
+        """Test that the users row keeps only hash, size and MIME type"""
+        mentee_id, headers = signup_and_login("mentee", "Image Mentee")
+        payload = {"name": "Image Mentee", "image": base64.b64encode(PNG_BYTES).decode()}
+
+        response = client.put("/api/profile", json=payload, headers=headers)
+        assert response.status_code == 200
+
+        db = TestingSessionLocal()
+        try:
+            user = db.query(User).filter(User.id == mentee_id).first()
+            assert user.image_size == len(PNG_BYTES)
+            assert user.image_mime == "image/png"
+            assert blob_store.read(user.image_hash) == PNG_BYTES
+        finally:
+            db.close()
+
+        image_response = client.get(f"/api/images/mentee/{mentee_id}")
+        assert image_response.status_code == 200
+        assert image_response.content == PNG_BYTES
+        assert image_response.headers["content-type"] == "image/png"
+
+    def test_identical_images_share_one_blob(self, client, signup_and_login):
+        """Test that two users uploading the same bytes get the same hash"""
+        encoded = base64.b64encode(JPEG_BYTES).decode()
+        user_ids = []
+        for name in ("First Mentor", "Second Mentor"):
+            user_id, headers = signup_and_login("mentor", name)
+            client.put("/api/profile", json={"name": name, "image": encoded}, headers=headers)
+            user_ids.append(user_id)
+
+        db = TestingSessionLocal()
+        try:
+            hashes = {user.image_hash for user in db.query(User).filter(User.id.in_(user_ids))}
+        finally:
+            db.close()
+        assert len(hashes) == 1
+
+    @pytest.mark.parametrize("image", ["not base64!", base64.b64encode(b"GIF89a....").decode()])
+    def test_invalid_image_rejected(self, client, signup_and_login, image):
+        """Test that undecodable or non jpg/png payloads return 400"""
+        _, headers = signup_and_login("mentee", "Bad Image Mentee")
+
+        response = client.put("/api/profile", json={"name": "Bad Image Mentee", "image": image}, headers=headers)
+
+        assert response.status_code == 400
+
+
+@pytest.fixture
+def seoul_time(monkeypatch):
+    """Run the test with the process in a timezone ahead of UTC"""
+    monkeypatch.setenv("TZ", "Asia/Seoul")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+class TestProfileImageServing:
+    """Test cache validators on the profile image endpoint"""
+
+    def _upload(self, client, signup_and_login, image_bytes):
+        mentor_id, headers = signup_and_login("mentor", "Cached Mentor")
+        payload = {"name": "Cached Mentor", "image": base64.b64encode(image_bytes).decode()}
+        assert client.put("/api/profile", json=payload, headers=headers).status_code == 200
+        return mentor_id
+
+    def test_image_response_has_cache_headers(self, client, signup_and_login):
+        """Test strong ETag from the content hash plus Cache-Control and Last-Modified"""
+        mentor_id = self._upload(client, signup_and_login, JPEG_BYTES)
+
+        response = client.get(f"/api/images/mentor/{mentor_id}")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/jpeg"
+        assert response.headers["etag"] == f'"{blob_store.put(JPEG_BYTES)}"'
+        assert "max-age" in response.headers["cache-control"]
+        assert "last-modified" in response.headers
+
+    def test_last_modified_is_utc_on_non_utc_host(self, client, signup_and_login, seoul_time):
+        """Test naive UTC timestamps from SQLite are not shifted by the host's timezone"""
+        assert http_date(datetime(2024, 1, 1)) == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+        mentor_id = self._upload(client, signup_and_login, JPEG_BYTES + b"tz")
+        with TestingSessionLocal() as db:
+            updated_at = db.get(User, mentor_id).updated_at
+
+        response = client.get(f"/api/images/mentor/{mentor_id}")
+
+        assert response.headers["last-modified"] == updated_at.strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+    def test_if_none_match_returns_304_without_reading_blob(self, client, signup_and_login):
+        """Test that a matching If-None-Match is answered from the row metadata alone"""
+        mentor_id = self._upload(client, signup_and_login, PNG_BYTES + b"304")
+        etag = client.get(f"/api/images/mentor/{mentor_id}").headers["etag"]
+
+        # Remove the blob: a 304 must not need it
+        os.unlink(blob_store.path_for(etag.strip('"')))
+        response = client.get(f"/api/images/mentor/{mentor_id}", headers={"If-None-Match": f'"other", {etag}'})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_stale_etag_gets_full_image(self, client, signup_and_login):
+        """Test that a non-matching If-None-Match returns the image"""
+        mentor_id = self._upload(client, signup_and_login, PNG_BYTES + b"200")
+
+        response = client.get(f"/api/images/mentor/{mentor_id}", headers={"If-None-Match": '"stale"'})
+
+        assert response.status_code == 200
+        assert response.content == PNG_BYTES + b"200"
+
+
+class TestProfileImageThumbnails:
+    """Test thumbnails generated in the background at upload"""
+
+    def _png(self, width, height):
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (width, height), (200, 40, 40)).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def test_thumbnails_served_by_size(self, client, signup_and_login):
+        """Test each fixed size is generated once and served with its own ETag"""
+        from PIL import Image
+
+        original = self._png(600, 600)
+        mentor_id, headers = signup_and_login("mentor", "Thumbnail Mentor")
+        payload = {"name": "Thumbnail Mentor", "image": base64.b64encode(original).decode()}
+        assert client.put("/api/profile", json=payload, headers=headers).status_code == 200
+        digest = blob_store.put(original)
+        wait_for_thumbnails(digest, timeout=10)
+
+        for size in THUMBNAIL_SIZES:
+            response = client.get(f"/api/images/mentor/{mentor_id}?size={size}")
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "image/png"
+            assert response.headers["etag"] == f'"{digest}.{size}px"'
+            assert Image.open(io.BytesIO(response.content)).size == (size, size)
+
+    def test_unsupported_size_rejected(self, client, signup_and_login):
+        """Test that sizes outside the fixed set return 400"""
+        mentor_id, _ = signup_and_login("mentor", "Thumbnail Mentor")
+
+        response = client.get(f"/api/images/mentor/{mentor_id}?size=65")
+
+        assert response.status_code == 400
+
+    def test_missing_thumbnail_falls_back_to_original(self, client, signup_and_login):
+        """Test the original is served uncached until the thumbnail exists"""
+        original = self._png(300, 300)
+        mentor_id, headers = signup_and_login("mentor", "Thumbnail Mentor")
+        payload = {"name": "Thumbnail Mentor", "image": base64.b64encode(original).decode()}
+        client.put("/api/profile", json=payload, headers=headers)
+        digest = blob_store.put(original)
+        wait_for_thumbnails(digest, timeout=10)
+        os.unlink(blob_store.path_for(digest, thumbnail_variant(64)))
+
+        response = client.get(f"/api/images/mentor/{mentor_id}?size=64")
+
+        assert response.status_code == 200
+        assert response.content == original
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_image_without_thumbnails_gets_them_on_request(self, client, signup_and_login):
+        """Test an image with no variants, e.g. one moved in by a migration, has them generated when asked for"""
+        from PIL import Image
+
+        original = self._png(200, 200)
+        mentor_id, headers = signup_and_login("mentor", "Migrated Mentor")
+        payload = {"name": "Migrated Mentor", "image": base64.b64encode(original).decode()}
+        client.put("/api/profile", json=payload, headers=headers)
+        digest = blob_store.put(original)
+        wait_for_thumbnails(digest, timeout=10)
+        for size in THUMBNAIL_SIZES:
+            os.unlink(blob_store.path_for(digest, thumbnail_variant(size)))
+
+        first = client.get(f"/api/images/mentor/{mentor_id}?size=64")
+        wait_for_thumbnails(digest, timeout=10)
+        second = client.get(f"/api/images/mentor/{mentor_id}?size=64")
+
+        assert first.content == original
+        assert first.headers["cache-control"] == "no-cache"
+        assert second.headers["etag"] == f'"{digest}.64px"'
+        assert Image.open(io.BytesIO(second.content)).size == (64, 64)
+        assert all(blob_store.exists(digest, thumbnail_variant(size)) for size in THUMBNAIL_SIZES)
@@ -0,0 +1,51 @@
+from app.models import User, MatchRequest, UserRole, MatchRequestStatus
+from app.projections import (
+    OUTGOING_MATCH_REQUEST_FIELDS, user_projection, match_request_projection
+)
+
+
+class TestUserProjection:
+    """Test compiled user converters"""
+
+    def test_full_mentor(self):
+        """Test a mentor row becomes the nested profile dict"""
+        projection = user_projection(UserRole.MENTOR)
+        row = (7, "m@test.com", "Mentor", None, ["Go"])
+
+        assert [column.key for column in projection.columns] == ["id", "email", "name", "bio", "skills"]
+        assert projection.convert(row) == {
+            "id": 7, "email": "m@test.com", "role": "mentor",
+            "profile": {"name": "Mentor", "bio": None, "imageUrl": "/images/mentor/7", "skills": ["Go"]},
+        }
+
+    def test_field_subset_selects_fewer_columns(self):
+        """Test only the requested columns are selected and trailing columns are ignored"""
+        projection = user_projection(UserRole.MENTOR, ("id", "skills"))
+
+        assert [column.key for column in projection.columns] == ["id", "skills"]
+        assert projection.convert((3, None, "sort key")) == {"id": 3, "profile": {"skills": []}}
+        assert user_projection(UserRole.MENTOR, ("email",)).convert((3, "e@test.com")) == {"id": 3, "email": "e@test.com"}
+
+    def test_mentee_has_no_skills(self):
+        """Test mentee projections never read or emit skills"""
+        user = User(id=2, email="e@test.com", name="Mentee", bio="hi", role=UserRole.MENTEE, skills=["x"])
+
+        assert user_projection(UserRole.MENTEE).from_object(user)["profile"] == {
+            "name": "Mentee", "bio": "hi", "imageUrl": "/images/mentee/2"
+        }
+
+
+class TestMatchRequestProjection:
+    """Test compiled match request converters"""
+
+    def test_shapes_share_one_column_layout(self):
+        """Test incoming and outgoing shapes read the same row"""
+        match_request = MatchRequest(id=1, mentor_id=2, mentee_id=3, message="hi", status=MatchRequestStatus.PENDING)
+        full = match_request_projection()
+        outgoing = match_request_projection(OUTGOING_MATCH_REQUEST_FIELDS)
+
+        assert full.columns == outgoing.columns
+        assert full.from_object(match_request) == {
+            "id": 1, "mentorId": 2, "menteeId": 3, "message": "hi", "status": "pending"
+        }
+        assert outgoing.from_object(match_request) == {"id": 1, "mentorId": 2, "menteeId": 3, "status": "pending"}
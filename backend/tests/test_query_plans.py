@@ -0,0 +1,169 @@
+import asyncio
+import re
+from collections import defaultdict
+from app import crud
+from app.models import UserRole, MatchRequestStatus
+from app.schemas import SignupRequest, MatchRequestCreate, UpdateMentorProfileRequest
+from tests.conftest import engine, async_engine, TestingAsyncSessionLocal, capture_sql
+
+# "SCAN <table>" without an index is a full table scan ("SCAN n CONSTANT ROWS" is a VALUES list)
+FULL_SCAN = re.compile(r"^SCAN (?!\d+ CONSTANT ROW)(\w+)(?! USING)")
+
+# Plan lines each crud call must contain: the index it is meant to use, and for joins the table
+# that drives them. Every call exercised below needs an entry.
+EXPECTED_PLANS = {
+    "get_user_by_email": ["SEARCH users USING INDEX ix_users_email (email=?)"],
+    "get_user_by_id": ["SEARCH users USING INTEGER PRIMARY KEY (rowid=?)"],
+    "get_user_token_version": ["SEARCH users USING INTEGER PRIMARY KEY (rowid=?)"],
+    "get_user_image_info": ["SEARCH users USING INTEGER PRIMARY KEY (rowid=?)"],
+    "update_mentor_profile": [
+        "SEARCH users USING INTEGER PRIMARY KEY (rowid=?)",
+        "SEARCH mentor_skills USING COVERING INDEX sqlite_autoindex_mentor_skills_1 (user_id=?)",
+    ],
+    "get_collection_version": ["SEARCH collection_versions USING INDEX sqlite_autoindex_collection_versions_1 (name=?)"],
+    "mentors": ["SEARCH users USING INDEX ix_users_role_name_id (role=?)"],
+    "mentors_by_name": ["SEARCH users USING INDEX ix_users_role_name_id (role=? AND name>?)"],
+    # Skill filters start from the skill index and fetch only the matching users
+    "mentors_with_skill": [
+        "SEARCH mentor_skills USING COVERING INDEX ix_mentor_skills_skill_user_id (skill=?)",
+        "SEARCH users USING INTEGER PRIMARY KEY (rowid=?)",
+    ],
+    "mentors_with_skill_after": [
+        "SEARCH mentor_skills USING COVERING INDEX ix_mentor_skills_skill_user_id (skill=? AND user_id>?)",
+        "SEARCH users USING INTEGER PRIMARY KEY (rowid=?)",
+    ],
+    "mentors_with_skill_by_name": [
+        "SEARCH mentor_skills USING COVERING INDEX ix_mentor_skills_skill_user_id (skill=?)",
+        "SEARCH users USING INTEGER PRIMARY KEY (rowid=?)",
+    ],
+    "mentors_with_skill_prefix": [
+        "SEARCH mentor_skills USING COVERING INDEX ix_mentor_skills_skill_user_id (skill>? AND skill<?)",
+        "SEARCH users USING INTEGER PRIMARY KEY (rowid=?)",
+    ],
+    "create_match_request": ["SEARCH users USING INTEGER PRIMARY KEY (rowid=?)"],
+    "incoming": ["SEARCH match_requests USING INDEX ix_match_requests_mentor_id_created_at_id (mentor_id=?)"],
+    "incoming_pending": [
+        "SEARCH match_requests USING INDEX ix_match_requests_mentor_id_status_created_at_id (mentor_id=? AND status=?)"
+    ],
+    "incoming_after": [
+        "SEARCH match_requests USING INDEX ix_match_requests_mentor_id_created_at_id (mentor_id=? AND created_at>?)"
+    ],
+    "outgoing": ["SEARCH match_requests USING INDEX ix_match_requests_mentee_id_created_at_id (mentee_id=?)"],
+    "outgoing_pending": [
+        "SEARCH match_requests USING INDEX ix_match_requests_mentee_id_status_created_at_id (mentee_id=? AND status=?)"
+    ],
+    "outgoing_after": [
+        "SEARCH match_requests USING INDEX ix_match_requests_mentee_id_created_at_id (mentee_id=? AND created_at>?)"
+    ],
+    "reject_match_request": ["SEARCH match_requests USING INTEGER PRIMARY KEY (rowid=?)"],
+    "accept_match_request": [
+        "SEARCH match_requests USING INTEGER PRIMARY KEY (rowid=?)",
+        "SEARCH match_requests_1 USING INDEX ix_match_requests_mentor_id_status_created_at_id (mentor_id=? AND status=?)",
+    ],
+    "cancel_match_request": ["SEARCH match_requests USING INTEGER PRIMARY KEY (rowid=?)"],
+    "process_match_requests": ["SEARCH match_requests USING INTEGER PRIMARY KEY (rowid=?)"],
+}
+
+
+def _capture_crud_statements():
+    """(call label, statement, parameters) for every statement the crud calls below issue"""
+    statements = []
+
+    async def exercise():
+        async with TestingAsyncSessionLocal() as db:
+            mentor = await crud.create_user(db, SignupRequest(
+                email="plan-mentor@test.com", password="x", name="Plan Mentor", role=UserRole.MENTOR
+            ), hashed_password="x")
+            mentee = await crud.create_user(db, SignupRequest(
+                email="plan-mentee@test.com", password="x", name="Plan Mentee", role=UserRole.MENTEE
+            ), hashed_password="x")
+
+            with capture_sql(async_engine, with_parameters=True) as captured:
+                async def run(label, call):
+                    start = len(captured)
+                    result = await call
+                    statements.extend(
+                        (label, statement, parameters) for statement, parameters in captured[start:]
+                        if statement.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE"))
+                    )
+                    return result
+
+                await run("get_user_by_email", crud.get_user_by_email(db, mentor.email))
+                await run("get_user_by_id", crud.get_user_by_id(db, mentor.id))
+                await run("get_user_token_version", crud.get_user_token_version(db, mentor.id))
+                await run("get_user_image_info", crud.get_user_image_info(db, mentor.id, "mentor"))
+                await run("update_mentor_profile", crud.update_mentor_profile(db, mentor.id, UpdateMentorProfileRequest(
+                    name="Plan Mentor", skills=["Python"]
+                )))
+                await run("get_collection_version", crud.get_collection_version(db, crud.MENTORS_COLLECTION))
+                await run("mentors", crud.get_mentors(db, limit=10))
+                await run("mentors_by_name", crud.get_mentors(db, order_by="name", after=["A", 0], limit=10))
+                await run("mentors_with_skill", crud.get_mentors(db, skill="python"))
+                await run("mentors_with_skill_after", crud.get_mentors(db, skill="python", after=[0], limit=10))
+                await run("mentors_with_skill_by_name", crud.get_mentors(
+                    db, skill="python", order_by="name", after=["A", 0], limit=10
+                ))
+                await run("mentors_with_skill_prefix", crud.get_mentors(db, skill="py", skill_prefix=True, limit=10))
+                first = await run("create_match_request", crud.create_match_request(db, mentee.id, MatchRequestCreate(
+                    mentorId=mentor.id, menteeId=mentee.id, message="hi"
+                )))
+                for label, list_requests, owner_id in (
+                    ("incoming", crud.get_incoming_match_requests, mentor.id),
+                    ("outgoing", crud.get_outgoing_match_requests, mentee.id),
+                ):
+                    await run(label, list_requests(db, owner_id))
+                    await run(f"{label}_pending", list_requests(
+                        db, owner_id, status=MatchRequestStatus.PENDING, limit=10
+                    ))
+                    await run(f"{label}_after", list_requests(
+                        db, owner_id, since=first.created_at, after=[first.created_at, first.id]
+                    ))
+                await run("reject_match_request", crud.reject_match_request(db, first.id, mentor.id))
+                second = await run("create_match_request", crud.create_match_request(db, mentee.id, MatchRequestCreate(
+                    mentorId=mentor.id, menteeId=mentee.id, message="again"
+                )))
+                await run("accept_match_request", crud.accept_match_request(db, second.id, mentor.id))
+                await run("cancel_match_request", crud.cancel_match_request(db, second.id, mentee.id))
+                for status in (MatchRequestStatus.ACCEPTED, MatchRequestStatus.REJECTED):
+                    await run("process_match_requests", crud.process_match_requests(
+                        db, mentor.id, [first.id, second.id], status
+                    ))
+
+    asyncio.run(exercise())
+    return statements
+
+
+def _plans(statements):
+    """EXPLAIN QUERY PLAN lines per call label"""
+    plans = defaultdict(list)
+    with engine.connect() as connection:
+        for label, statement, parameters in statements:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)).all()
+            plans[label] += [(row.detail, " ".join(statement.split())) for row in plan]
+    return plans
+
+
+class TestQueryPlans:
+    """Test that crud queries are served by the indexes meant for them"""
+
+    def test_crud_queries_avoid_table_scans(self, test_db):
+        """Test no statement the crud layer issues scans a whole table"""
+        plans = _plans(_capture_crud_statements())
+        assert plans
+
+        scans = [(detail, statement) for lines in plans.values() for detail, statement in lines if FULL_SCAN.match(detail)]
+
+        assert scans == []
+
+    def test_crud_queries_use_expected_indexes(self, test_db):
+        """Test each crud call's plan contains the index lookups it was designed around"""
+        plans = _plans(_capture_crud_statements())
+
+        assert set(plans) == set(EXPECTED_PLANS)
+        missing = {
+            label: [line for line in expected if line not in {detail for detail, _ in plans[label]}]
+            for label, expected in EXPECTED_PLANS.items()
+        }
+        assert {label: lines for label, lines in missing.items() if lines} == {}, {
+            label: sorted({detail for detail, _ in plans[label]}) for label, lines in missing.items() if lines
+        }
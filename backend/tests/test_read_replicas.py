@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from app.database import ReplicaRouter, to_async_url, _recent_writers
+from tests.conftest import SQLALCHEMY_DATABASE_URL, capture_sql
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """A 'replica' engine on the test database that records the SQL it runs"""
+    engine = create_async_engine(to_async_url(SQLALCHEMY_DATABASE_URL), poolclass=NullPool)
+    monkeypatch.setattr("app.database.replica_router", ReplicaRouter([engine]))
+    _recent_writers.clear()
+    with capture_sql(engine) as statements:
+        yield statements
+    _recent_writers.clear()
+
+
+class TestReadReplicaRouting:
+    """Test that read-only endpoints are served from replicas"""
+
+    def test_read_endpoints_use_replica(self, client, signup_and_login, replica):
+        """Test mentor listing and request lists query the replica"""
+        _, mentee_headers = signup_and_login("mentee", "Replica Mentee")
+
+        assert client.get("/api/mentors", headers=mentee_headers).status_code == 200
+        assert client.get("/api/match-requests/outgoing", headers=mentee_headers).status_code == 200
+
+        assert any("FROM users" in statement for statement in replica)
+        assert any("FROM match_requests" in statement for statement in replica)
+
+    def test_writes_stay_on_primary(self, client, signup_and_login, replica):
+        """Test that profile updates never touch the replica"""
+        _, headers = signup_and_login("mentee", "Writer Mentee")
+        replica.clear()
+
+        response = client.put("/api/profile", json={"name": "Renamed"}, headers=headers)
+
+        assert response.status_code == 200
+        assert not any(statement.startswith("UPDATE") for statement in replica)
+
+    def test_read_your_writes_window(self, client, signup_and_login, replica, monkeypatch):
+        """Test a user who just wrote reads from the primary until the window passes"""
+        _, headers = signup_and_login("mentee", "Fresh Writer")
+        client.put("/api/profile", json={"name": "Fresh Writer", "bio": "new"}, headers=headers)
+        replica.clear()
+
+        assert client.get("/api/me", headers=headers).json()["profile"]["bio"] == "new"
+        assert replica == []
+
+        _recent_writers.clear()
+        client.get("/api/me", headers=headers)
+        assert replica != []
+
+
+class TestReplicaRouter:
+    """Test replica selection strategies"""
+
+    class _FakePool:
+        def __init__(self, checked_out):
+            self._checked_out = checked_out
+
+        def checkedout(self):
+            return self._checked_out
+
+    class _FakeEngine:
+        def __init__(self, name, checked_out=0):
+            self.name = name
+            self.sync_engine = type("SyncEngine", (), {"pool": TestReplicaRouter._FakePool(checked_out)})()
+
+    def test_round_robin(self):
+        """Test replicas are used in turn"""
+        engines = [self._FakeEngine("a"), self._FakeEngine("b")]
+        router = ReplicaRouter(engines)
+
+        assert [router.choose().name for _ in range(4)] == ["a", "b", "a", "b"]
+
+    def test_least_loaded(self):
+        """Test the replica with the fewest checked-out connections wins"""
+        router = ReplicaRouter(
+            [self._FakeEngine("busy", 5), self._FakeEngine("idle", 1)], strategy="least_loaded"
+        )
+
+        assert router.choose().name == "idle"
+
+    def test_unknown_strategy(self):
+        """Test misconfiguration fails fast"""
+        with pytest.raises(ValueError):
+            ReplicaRouter([], strategy="random")
@@ -0,0 +1,59 @@
+import asyncio
+from sqlalchemy import select, text
+from app.models import User
+from tests.conftest import TestingAsyncSessionLocal
+
+
+class TestResponseModels:
+    """Test responses serialized through the typed response models"""
+
+    def test_profile_shapes(self, client, signup_and_login):
+        """Test mentors get skills in their profile and mentees don't"""
+        mentor_id, mentor_headers = signup_and_login("mentor", "Shape Mentor")
+        mentee_id, mentee_headers = signup_and_login("mentee", "Shape Mentee")
+
+        mentor = client.get("/api/me", headers=mentor_headers).json()
+        mentee = client.get("/api/me", headers=mentee_headers).json()
+
+        assert mentor == {"id": mentor_id, "email": mentor["email"], "role": "mentor", "profile": {
+            "name": "Shape Mentor", "bio": None, "imageUrl": f"/images/mentor/{mentor_id}", "skills": []
+        }}
+        assert mentee["role"] == "mentee"
+        assert mentee["profile"] == {"name": "Shape Mentee", "bio": None, "imageUrl": f"/images/mentee/{mentee_id}"}
+
+    def test_match_request_fields(self, client, signup_and_login):
+        """Test camelCase ids on every match request response and no message on outgoing"""
+        mentor_id, mentor_headers = signup_and_login("mentor", "Field Mentor")
+        mentee_id, mentee_headers = signup_and_login("mentee", "Field Mentee")
+
+        created = client.post("/api/match-requests", json={
+            "mentorId": mentor_id, "menteeId": mentee_id, "message": "hi"
+        }, headers=mentee_headers).json()
+
+        assert created == {
+            "id": created["id"], "mentorId": mentor_id, "menteeId": mentee_id, "message": "hi", "status": "pending"
+        }
+        assert client.get("/api/match-requests/incoming", headers=mentor_headers).json() == [created]
+        assert client.get("/api/match-requests/outgoing", headers=mentee_headers).json() == [
+            {"id": created["id"], "mentorId": mentor_id, "menteeId": mentee_id, "status": "pending"}
+        ]
+
+
+class TestSkillsColumn:
+    """Test users.skills is decoded by the column type"""
+
+    def test_round_trip(self, client, signup_and_login):
+        """Test the ORM sees a list while the database keeps the JSON text"""
+        mentor_id, headers = signup_and_login("mentor", "Skilled Mentor")
+        client.put("/api/profile", json={"name": "Skilled Mentor", "skills": ["React", "한국어"]}, headers=headers)
+
+        async def load():
+            async with TestingAsyncSessionLocal() as db:
+                decoded = (await db.execute(select(User.skills).where(User.id == mentor_id))).scalar_one()
+                stored = (await db.execute(text("SELECT skills FROM users WHERE id = :id"), {"id": mentor_id})).scalar_one()
+                return decoded, stored
+
+        decoded, stored = asyncio.run(load())
+
+        assert decoded == ["React", "한국어"]
+        assert stored == '["React", "\\ud55c\\uad6d\\uc5b4"]'
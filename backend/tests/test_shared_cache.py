@@ -0,0 +1,154 @@
+import asyncio
+import pytest
+from app.cache import TTLCache, SharedCache, SingleFlight, MemoryCacheBackend, RedisCacheBackend
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _worker(server):
+    """One uvicorn worker's view: its own local tier and connection to the shared server"""
+    backend = RedisCacheBackend(fakeredis.aioredis.FakeRedis(server=server), prefix="test:")
+    cache = SharedCache("token_version", TTLCache(100, ttl=30), backend,
+                        encode=lambda version: str(version).encode(), decode=int)
+    return backend, cache
+
+
+async def _eventually(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+class TestSingleFlight:
+    """Test request coalescing"""
+
+    def test_concurrent_misses_run_loader_once(self):
+        """Test a burst of misses for one key results in a single load"""
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 7
+
+        async def scenario():
+            cache = SharedCache("token_version", TTLCache(100, ttl=30), MemoryCacheBackend())
+            results = await asyncio.gather(*(cache.get_or_load(1, loader) for _ in range(20)))
+            return results, cache
+
+        results, cache = asyncio.run(scenario())
+
+        assert results == [7] * 20
+        assert calls == [1]
+        assert cache.flight.coalesced == 19
+
+    def test_cancelled_caller_does_not_cancel_the_load(self):
+        """Test waiters still get the value when the first caller goes away"""
+        async def loader():
+            await asyncio.sleep(0.05)
+            return "value"
+
+        async def scenario():
+            flight = SingleFlight()
+            first = asyncio.ensure_future(flight.do("key", loader))
+            second = asyncio.ensure_future(flight.do("key", loader))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(scenario()) == "value"
+
+
+class TestRedisCacheBackend:
+    """Test the shared tier and invalidation fan-out against a fake Redis server"""
+
+    def test_second_worker_reads_shared_tier(self):
+        """Test a value loaded by one worker is reused by another without reloading"""
+        async def scenario():
+            server = fakeredis.FakeServer()
+            (backend_a, cache_a), (backend_b, cache_b) = _worker(server), _worker(server)
+            loads = []
+
+            async def loader():
+                loads.append(1)
+                return 3
+
+            first = await cache_a.get_or_load(42, loader)
+            second = await cache_b.get_or_load(42, loader)
+            return first, second, loads, cache_b.shared_hits
+
+        assert asyncio.run(scenario()) == (3, 3, [1], 1)
+
+    def test_invalidation_fans_out_to_every_worker(self):
+        """Test invalidating in one worker drops the entry from the others' local tiers"""
+        async def scenario():
+            server = fakeredis.FakeServer()
+            (backend_a, cache_a), (backend_b, cache_b) = _worker(server), _worker(server)
+            await backend_a.start()
+            await backend_b.start()
+            try:
+                async def loader():
+                    return 1
+
+                await cache_a.get_or_load(42, loader)
+                await cache_b.get_or_load(42, loader)
+                assert cache_b.local.get(42) == 1
+
+                await cache_a.invalidate(42)
+                await _eventually(lambda: len(cache_b.local) == 0)
+                assert await backend_b.get("token_version:42") is None
+            finally:
+                await backend_a.close()
+                await backend_b.close()
+
+        asyncio.run(scenario())
+
+    def test_listener_resubscribes_after_outage(self, monkeypatch):
+        """Test a lost subscription is re-established and the local tier cleared of possibly stale entries"""
+        monkeypatch.setattr("app.cache.CACHE_RECONNECT_MIN_SECONDS", 0.01)
+
+        async def scenario():
+            server = fakeredis.FakeServer()
+            (backend_a, cache_a), (backend_b, cache_b) = _worker(server), _worker(server)
+            await backend_b.start()
+            try:
+                cache_b.set_local(42, 1)
+                server.connected = False
+                await _eventually(lambda: backend_b._pubsub is None)
+                assert not backend_b._listener.done()
+
+                server.connected = True
+                await _eventually(lambda: backend_b._pubsub is not None)
+                assert len(cache_b.local) == 0
+
+                # Invalidations reach the new subscription again
+                cache_b.set_local(42, 2)
+                await cache_a.invalidate(42)
+                await _eventually(lambda: len(cache_b.local) == 0)
+            finally:
+                await backend_a.close()
+                await backend_b.close()
+
+        asyncio.run(scenario())
+
+    def test_unreachable_shared_tier_falls_back_to_loader(self):
+        """Test a broken shared tier degrades to a plain local cache"""
+        class BrokenBackend(MemoryCacheBackend):
+            shared = True
+
+            async def get(self, key):
+                raise ConnectionError("redis is down")
+
+            async def set(self, key, value, ttl):
+                raise ConnectionError("redis is down")
+
+        async def scenario():
+            cache = SharedCache("token_version", TTLCache(100, ttl=30), BrokenBackend())
+
+            async def loader():
+                return 5
+
+            return await cache.get_or_load(1, loader), cache.shared_errors
+
+        assert asyncio.run(scenario()) == (5, 2)
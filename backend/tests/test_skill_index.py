@@ -0,0 +1,45 @@
+import pytest
+
+
+class TestMentorSkillIndex:
+    """Test skill filtering through the mentor_skills index"""
+
+    def _create_mentor(self, client, signup_and_login, name, skills):
+        mentor_id, headers = signup_and_login("mentor", name)
+        response = client.put("/api/profile", json={"name": name, "skills": skills}, headers=headers)
+        assert response.status_code == 200
+        return mentor_id, headers
+
+    def test_exact_skill_match_has_no_substring_false_positives(self, client, signup_and_login, auth_headers_mentee):
+        """Test that 'java' does not match 'javascript'"""
+        java_id, _ = self._create_mentor(client, signup_and_login, "Java Mentor", ["Java", "Spring"])
+        js_id, _ = self._create_mentor(client, signup_and_login, "JS Mentor", ["JavaScript"])
+
+        response = client.get("/api/mentors?skill=java", headers=auth_headers_mentee)
+
+        assert response.status_code == 200
+        ids = [mentor["id"] for mentor in response.json()]
+        assert ids == [java_id]
+        assert js_id not in ids
+
+    def test_skill_prefix_match(self, client, signup_and_login, auth_headers_mentee):
+        """Test prefix lookup returns every mentor whose skill starts with the term"""
+        java_id, _ = self._create_mentor(client, signup_and_login, "Java Mentor", ["Java"])
+        js_id, _ = self._create_mentor(client, signup_and_login, "JS Mentor", ["JavaScript"])
+        self._create_mentor(client, signup_and_login, "Go Mentor", ["Go"])
+
+        response = client.get("/api/mentors?skill=Jav&skill_prefix=true", headers=auth_headers_mentee)
+
+        assert response.status_code == 200
+        assert sorted(mentor["id"] for mentor in response.json()) == sorted([java_id, js_id])
+
+    def test_profile_update_replaces_indexed_skills(self, client, signup_and_login, auth_headers_mentee):
+        """Test that updating skills drops stale index entries"""
+        mentor_id, headers = self._create_mentor(client, signup_and_login, "Changing Mentor", ["Python"])
+
+        client.put("/api/profile", json={"name": "Changing Mentor", "skills": ["Rust"]}, headers=headers)
+
+        python_response = client.get("/api/mentors?skill=python", headers=auth_headers_mentee)
+        rust_response = client.get("/api/mentors?skill=RUST", headers=auth_headers_mentee)
+        assert python_response.json() == []
+        assert [mentor["id"] for mentor in rust_response.json()] == [mentor_id]
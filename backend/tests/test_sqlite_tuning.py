@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from app.database import apply_sqlite_pragmas
+
+
+class TestSqliteTuning:
+    """Test the SQLite pragmas applied on connect"""
+
+    def _pragmas(self, connection):
+        return {
+            name: connection.execute(text(f"PRAGMA {name}")).scalar()
+            for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size", "temp_store")
+        }
+
+    def test_sync_connections_get_profile(self, tmp_path):
+        """Test WAL, synchronous=NORMAL, busy timeout, cache, mmap and temp_store"""
+        engine = create_engine(f"sqlite:///{tmp_path}/tuned.db")
+        apply_sqlite_pragmas(engine)
+
+        with engine.connect() as connection:
+            pragmas = self._pragmas(connection)
+
+        assert pragmas == {
+            "journal_mode": "wal",
+            "synchronous": 1,  # NORMAL
+            "busy_timeout": 5000,
+            "cache_size": -20000,
+            "mmap_size": 256 * 1024 * 1024,
+            "temp_store": 2,  # MEMORY
+        }
+
+    def test_async_connections_get_profile(self, tmp_path):
+        """Test the same profile through aiosqlite"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/tuned.db", poolclass=NullPool)
+        apply_sqlite_pragmas(engine)
+
+        async def read_pragmas():
+            async with engine.connect() as connection:
+                return await connection.run_sync(self._pragmas)
+
+        pragmas = asyncio.run(read_pragmas())
+        assert pragmas["journal_mode"] == "wal"
+        assert pragmas["busy_timeout"] == 5000
+
+    def test_pragmas_are_configurable(self, tmp_path):
+        """Test overriding a pragma and skipping another with an empty value"""
+        engine = create_engine(f"sqlite:///{tmp_path}/custom.db")
+        apply_sqlite_pragmas(engine, {"busy_timeout": "250", "journal_mode": ""})
+
+        with engine.connect() as connection:
+            pragmas = self._pragmas(connection)
+
+        assert pragmas["busy_timeout"] == 250
+        assert pragmas["journal_mode"] == "delete"
@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(args, cwd, **env):
+    return subprocess.run(
+        [sys.executable, *args], cwd=cwd, capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONPATH": BACKEND_DIR, **env}
+    )
+
+
+class TestStartup:
+    """Test what a worker does when it starts"""
+
+    def test_import_is_side_effect_free(self, tmp_path):
+        """Test importing the app neither touches the database nor loads passlib/jose"""
+        result = _run(["-c", "import sys, main; print(sorted(m for m in ('passlib', 'jose') if m in sys.modules))"],
+                      cwd=tmp_path, DATABASE_URL="sqlite:///./app.db")
+
+        assert result.stdout.strip() == "[]"
+        assert not (tmp_path / "app.db").exists()
+
+    def test_check_startup_migrates_to_head(self, tmp_path):
+        """Test the lifespan hook runs the Alembic migrations and the report covers each phase"""
+        result = _run([os.path.join(BACKEND_DIR, "main.py"), "--check-startup"],
+                      cwd=tmp_path, DATABASE_URL="sqlite:///./app.db", SCHEMA_SETUP="migrate")
+
+        for phase in ("imports", "app setup", "lifespan", "total"):
+            assert phase in result.stdout
+        with sqlite3.connect(tmp_path / "app.db") as connection:
+            tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert {"alembic_version", "users", "match_requests"} <= tables
+
+    def test_check_startup_adopts_unversioned_database(self, tmp_path):
+        """Test a database created before Alembic (tables but no version) is stamped and migrated"""
+        _run(["-c", "from alembic import command; from alembic.config import Config; "
+                    "config = Config(); config.set_main_option('script_location', 'alembic'); "
+                    "command.upgrade(config, '001_initial')"],
+             cwd=BACKEND_DIR, DATABASE_URL=f"sqlite:///{tmp_path / 'app.db'}")
+        with sqlite3.connect(tmp_path / "app.db") as connection:
+            connection.execute("DROP TABLE alembic_version")
+
+        _run([os.path.join(BACKEND_DIR, "main.py"), "--check-startup"],
+             cwd=tmp_path, DATABASE_URL="sqlite:///./app.db", SCHEMA_SETUP="migrate")
+
+        with sqlite3.connect(tmp_path / "app.db") as connection:
+            version = connection.execute("SELECT version_num FROM alembic_version").fetchone()[0]
+            tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert version == "009_collection_versions"
+        assert {"mentor_skills", "collection_versions"} <= tables
+
+    def test_concurrent_migrations_take_turns(self, tmp_path):
+        """Test workers migrating a fresh database at the same time all succeed"""
+        workers = [
+            subprocess.Popen(
+                [sys.executable, os.path.join(BACKEND_DIR, "main.py"), "--migrate"],
+                cwd=tmp_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                env={**os.environ, "PYTHONPATH": BACKEND_DIR, "DATABASE_URL": "sqlite:///./app.db"}
+            )
+            for _ in range(4)
+        ]
+        errors = [worker.communicate()[1] for worker in workers]
+
+        assert [worker.returncode for worker in workers] == [0] * 4, errors
+        with sqlite3.connect(tmp_path / "app.db") as connection:
+            version = connection.execute("SELECT version_num FROM alembic_version").fetchall()
+        assert version == [("009_collection_versions",)]
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from app.cache import user_cache, token_version_cache
+from app.crud import revoke_user_tokens
+from tests.conftest import TestingAsyncSessionLocal
+
+
+@pytest.fixture
+def stateless_auth(monkeypatch):
+    monkeypatch.setattr("app.auth.AUTH_STATELESS", True)
+    user_cache.clear()
+    token_version_cache.clear()
+    yield
+    user_cache.clear()
+    token_version_cache.clear()
+
+
+class TestStatelessAuth:
+    """Test authorization from verified token claims"""
+
+    def test_role_endpoints_skip_user_lookup(self, client, signup_and_login, stateless_auth, monkeypatch):
+        """Test that mentor-only endpoints never load the user row"""
+        _, headers = signup_and_login("mentor", "Stateless Mentor")
+
+        async def fail_lookup(db, user_id):
+            raise AssertionError("user row should not be loaded")
+
+        monkeypatch.setattr("app.auth.get_user_by_id", fail_lookup)
+        response = client.get("/api/match-requests/incoming", headers=headers)
+
+        assert response.status_code == 200
+
+    def test_role_is_taken_from_claims(self, client, signup_and_login, stateless_auth):
+        """Test that role checks still reject the wrong role"""
+        _, headers = signup_and_login("mentee", "Stateless Mentee")
+
+        response = client.get("/api/match-requests/incoming", headers=headers)
+
+        assert response.status_code == 403
+
+    def test_full_user_is_served_from_cache(self, client, signup_and_login, stateless_auth, monkeypatch):
+        """Test that /me hits the DB once and then the TTL cache"""
+        _, headers = signup_and_login("mentee", "Cached Mentee")
+        calls = []
+        from app import auth
+        original_lookup = auth.get_user_by_id
+
+        async def counting_lookup(db, user_id):
+            calls.append(user_id)
+            return await original_lookup(db, user_id)
+
+        monkeypatch.setattr("app.auth.get_user_by_id", counting_lookup)
+
+        first = client.get("/api/me", headers=headers)
+        second = client.get("/api/me", headers=headers)
+
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+        assert len(calls) == 1
+
+    def test_revoked_token_is_rejected(self, client, signup_and_login, stateless_auth):
+        """Test that bumping token_version invalidates outstanding tokens"""
+        mentor_id, headers = signup_and_login("mentor", "Revoked Mentor")
+        assert client.get("/api/match-requests/incoming", headers=headers).status_code == 200
+
+        async def revoke():
+            async with TestingAsyncSessionLocal() as db:
+                await revoke_user_tokens(db, mentor_id)
+
+        asyncio.run(revoke())
+
+        assert client.get("/api/match-requests/incoming", headers=headers).status_code == 401
+        assert client.get("/api/me", headers=headers).status_code == 401
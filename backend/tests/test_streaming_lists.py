@@ -0,0 +1,83 @@
+import asyncio
+import json
+import pytest
+from app import routes
+from app.cache import ResponseCache, mentor_list_cache
+from app.streaming import json_array
+
+
+async def _batches(*batches):
+    for batch in batches:
+        yield batch
+
+
+def _collect(chunks):
+    async def scenario():
+        return [chunk async for chunk in chunks]
+    return asyncio.run(scenario())
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    """Stream lists one row at a time"""
+    monkeypatch.setattr(routes, "STREAM_BATCH_SIZE", 1)
+
+
+class TestJsonArray:
+    """Test incremental JSON array encoding"""
+
+    def test_chunk_per_batch(self):
+        """Test each batch is one chunk and the chunks form a valid array"""
+        chunks = _collect(json_array(_batches([(1,), (2,)], [], [(3,)]), lambda row: {"id": row[0]}))
+
+        assert len(chunks) == 3
+        assert json.loads(b"".join(chunks)) == [{"id": 1}, {"id": 2}, {"id": 3}]
+        assert _collect(json_array(_batches(), lambda row: row)) == [b"[]"]
+
+    def test_cache_writer_gives_up_on_large_bodies(self):
+        """Test bodies over the cache's limit are not buffered or stored"""
+        cache = ResponseCache(max_bytes=16)
+        _collect(json_array(_batches([(1,)] * 10), lambda row: {"id": row[0]}, sink=cache.writer("big", {})))
+        _collect(json_array(_batches([(1,)]), lambda row: {"id": row[0]}, sink=cache.writer("small", {})))
+
+        assert cache.get("big") is None
+        assert cache.get("small") == (b'[{"id":1}]', {})
+
+
+class TestStreamedLists:
+    """Test unpaginated lists are streamed"""
+
+    def test_mentor_list(self, client, signup_and_login, small_batches):
+        """Test the streamed directory matches the paginated one and is cached once complete"""
+        for i in range(3):
+            signup_and_login("mentor", f"Streamed {i}")
+        _, headers = signup_and_login("mentee", "Exporter")
+
+        response = client.get("/api/mentors", headers=headers)
+
+        assert response.status_code == 200
+        assert "content-length" not in response.headers
+        assert response.headers["ETag"].startswith('W/"mentors.')
+        paged = client.get("/api/mentors?limit=100", headers=headers).json()
+        assert response.json() == paged
+        hits = mentor_list_cache.hits
+        assert client.get("/api/mentors", headers=headers).content == response.content
+        assert mentor_list_cache.hits == hits + 1
+
+    def test_match_request_lists(self, client, signup_and_login, small_batches):
+        """Test both request lists stream every row with their ETag"""
+        mentor_id, mentor_headers = signup_and_login("mentor", "Streamed Mentor")
+        created = []
+        for i in range(3):
+            mentee_id, mentee_headers = signup_and_login("mentee", f"Streamed Mentee {i}")
+            created.append(client.post("/api/match-requests", json={
+                "mentorId": mentor_id, "menteeId": mentee_id, "message": str(i)
+            }, headers=mentee_headers).json())
+
+        incoming = client.get("/api/match-requests/incoming", headers=mentor_headers)
+        outgoing = client.get("/api/match-requests/outgoing", headers=mentee_headers)
+
+        assert incoming.json() == created
+        assert incoming.headers["ETag"].startswith(f'W/"match_requests:{mentor_id}.')
+        assert outgoing.json() == [{key: value for key, value in created[-1].items() if key != "message"}]
+        assert client.get("/api/match-requests/incoming?cursor=garbage", headers=mentor_headers).status_code == 400
@@ -0,0 +1,72 @@
+import time
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from app.auth import verify_token, SECRET_KEY, ALGORITHM
+from app.cache import TTLCache, token_cache
+
+
+def _token(exp_offset):
+    now = int(time.time())
+    return jwt.encode({
+        "iss": "mentor-mentee-app",
+        "aud": "mentor-mentee-app",
+        "sub": "1",
+        "iat": now,
+        "nbf": now,
+        "exp": now + exp_offset,
+        "role": "mentee"
+    }, SECRET_KEY, algorithm=ALGORITHM)
+
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+class TestTokenCache:
+    """Test caching of verified JWT payloads"""
+
+    def test_repeat_verification_hits_cache(self, monkeypatch):
+        """Test that the second verification of a token skips jwt.decode"""
+        token = _token(3600)
+        first = verify_token(token)
+
+        monkeypatch.setattr("jose.jwt.decode", lambda *args, **kwargs: pytest.fail("decoded twice"))
+        hits_before = token_cache.hits
+        second = verify_token(token)
+
+        assert second == first
+        assert token_cache.hits == hits_before + 1
+
+    def test_entry_expires_with_token(self, monkeypatch):
+        """Test that a cached token stops being served once its exp passes"""
+        token = _token(3600)
+        verify_token(token)
+        clock = time.monotonic() + 3601
+        monkeypatch.setattr("app.cache.time.monotonic", lambda: clock)
+
+        assert token_cache.get(token) is None
+
+    def test_invalid_tokens_are_not_cached(self):
+        """Test that failed verifications leave the cache empty"""
+        with pytest.raises(HTTPException):
+            verify_token(_token(3600) + "tampered")
+        with pytest.raises(HTTPException):
+            verify_token(_token(-10))
+
+        assert len(token_cache) == 0
+
+    def test_cache_is_bounded_lru(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = TTLCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["entries"] == 2